@@ -71,6 +71,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'root.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -91,6 +92,19 @@ CSRF_TRUSTED_ORIGINS = [
     "https://ec2-54-66-39-8.ap-southeast-2.compute.amazonaws.com",
 ]
 
+# Django REST framework: orjson for JSON in and out, same bytes as the stdlib renderer
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'root.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'root.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
 ROOT_URLCONF = 'EmsBackend.urls'
 
 TEMPLATES = [
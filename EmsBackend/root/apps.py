@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class RootConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'root'
+
+    def ready(self):
+        # Connects the signals that drop the reference data caches on writes
+        from . import reference  # noqa: F401
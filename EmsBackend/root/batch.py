@@ -0,0 +1,161 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+
+# Most sub-requests one batch may carry; override with BATCH_MAX_REQUESTS in settings
+BATCH_MAX_REQUESTS = getattr(settings, 'BATCH_MAX_REQUESTS', 20)
+
+# Threads (and so database connections) one batch may use for its reads
+BATCH_MAX_WORKERS = getattr(settings, 'BATCH_MAX_WORKERS', 4)
+
+BATCH_METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE')
+READ_METHODS = ('GET', 'HEAD')
+
+BATCH_URLCONF = 'root.urls'
+
+# Sub-response bodies are inlined into the JSON batch payload, so only these can be carried
+BATCH_CONTENT_TYPES = ('application/json', 'application/x-ndjson')
+
+
+def validate_batch(data):
+    """
+    The sub-requests of a batch body, normalised to [{'method', 'path', 'body'}].
+    Raises ValueError describing the first problem.
+    """
+    if not isinstance(data, list):
+        raise ValueError('Expected a list of {method, path, body} sub-requests')
+    if len(data) > BATCH_MAX_REQUESTS:
+        raise ValueError(f'A batch may hold at most {BATCH_MAX_REQUESTS} sub-requests')
+    sub_requests = []
+    for i, item in enumerate(data):
+        if not isinstance(item, dict):
+            raise ValueError(f'Sub-request {i} is not an object')
+        method = str(item.get('method', 'GET')).upper()
+        path = item.get('path')
+        if method not in BATCH_METHODS:
+            raise ValueError(f"Sub-request {i}: method must be one of {', '.join(BATCH_METHODS)}")
+        if not isinstance(path, str) or not path.startswith('/'):
+            raise ValueError(f"Sub-request {i}: path must be an absolute path such as '/departments/'")
+        sub_requests.append({'method': method, 'path': path, 'body': item.get('body')})
+    return sub_requests
+
+
+def _sub_request(outer, method, path, body):
+    """
+    A WSGIRequest for one sub-request, carrying the outer request's headers, cookies and user
+    """
+    path_info, _, query_string = path.partition('?')
+    content = json.dumps(body).encode() if body is not None else b''
+    environ = dict(outer.META)
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path_info,
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': query_string,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(content)),
+        'wsgi.input': BytesIO(content),
+        # Bodies are decoded back into the batch payload, so always ask for JSON
+        'HTTP_ACCEPT': 'application/json',
+    })
+    # Conditional headers belong to the batch, not to each sub-request
+    for header in ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE', 'HTTP_IF_MATCH', 'HTTP_IF_UNMODIFIED_SINCE'):
+        environ.pop(header, None)
+    request = WSGIRequest(environ)
+    for attribute in ('user', 'session'):
+        if hasattr(outer, attribute):
+            setattr(request, attribute, getattr(outer, attribute))
+    return request
+
+
+class NotBatchable(Exception):
+    """
+    A sub-response whose body cannot be carried inside the JSON batch payload
+    """
+
+
+def _body(response):
+    """
+    The decoded JSON body of a sub-response. Raises NotBatchable for a body that cannot be
+    inlined (binary exports, other text formats, encoded content).
+    """
+    if hasattr(response, 'render'):
+        response.render()
+    content_type = response.get('Content-Type', '')
+    if response.has_header('Content-Encoding') or not content_type.startswith(BATCH_CONTENT_TYPES):
+        if response.streaming:
+            response.close()
+        elif not response.content:
+            return None
+        raise NotBatchable(f"A {content_type or 'non-JSON'} response cannot be returned in a batch; "
+                           f"request it on its own")
+    content = b''.join(response.streaming_content) if response.streaming else response.content
+    if not content:
+        return None
+    if content_type.startswith('application/x-ndjson'):
+        return [json.loads(line) for line in content.splitlines() if line]
+    return json.loads(content)
+
+
+def dispatch(outer, sub_request):
+    """
+    Run one sub-request through the URL resolver and its view; returns {'status', 'body'}
+    """
+    method, path = sub_request['method'], sub_request['path']
+    try:
+        match = resolve(path.partition('?')[0], urlconf=BATCH_URLCONF)
+    except Resolver404:
+        return {'status': 404, 'body': {'error': f'No endpoint at {path}'}}
+    if match.url_name == 'batch_requests':
+        return {'status': 400, 'body': {'error': 'Batches cannot be nested'}}
+    try:
+        response = match.func(_sub_request(outer, method, path, sub_request['body']), *match.args, **match.kwargs)
+        return {'status': response.status_code, 'body': _body(response)}
+    except NotBatchable as e:
+        return {'status': 406, 'body': {'error': str(e)}}
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.exception(f"Batch sub-request {method} {path} failed")
+        return {'status': 500, 'body': {'error': str(e)}}
+
+
+def _dispatch_in_thread(outer, sub_request):
+    try:
+        return dispatch(outer, sub_request)
+    finally:
+        # Pool threads are short-lived; don't leave their connections open
+        connections.close_all()
+
+
+def run_batch(outer, sub_requests):
+    """
+    Dispatch sub-requests in order and return their results in the same order. Each run of
+    consecutive reads goes out concurrently on up to BATCH_MAX_WORKERS threads; a write waits
+    for the reads before it and finishes before anything after it starts.
+    """
+    results = []
+    reads = []
+
+    def flush_reads():
+        if len(reads) > 1 and BATCH_MAX_WORKERS > 1:
+            with ThreadPoolExecutor(max_workers=min(BATCH_MAX_WORKERS, len(reads))) as pool:
+                results.extend(pool.map(lambda sub_request: _dispatch_in_thread(outer, sub_request), reads))
+        else:
+            results.extend(dispatch(outer, sub_request) for sub_request in reads)
+        reads.clear()
+
+    for sub_request in sub_requests:
+        if sub_request['method'] in READ_METHODS:
+            reads.append(sub_request)
+            continue
+        flush_reads()
+        results.append(dispatch(outer, sub_request))
+    flush_reads()
+    return results
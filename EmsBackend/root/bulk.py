@@ -0,0 +1,225 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from .dashboard import apply_dashboard_delta, dashboard_contribution, sum_contributions
+from .payroll import fill_missing_contributions
+from .serializers import (BankAccountDetailsSerializer, EmployeeDetailsSerializer, EmployeeLeaveBalanceSerializer,
+                          ResourceAllocationSerializer, SalarySerializer)
+from .versioning import bump_table_versions
+
+
+# Most items one bulk request may carry; override with BULK_MAX_ITEMS in settings
+BULK_MAX_ITEMS = getattr(settings, 'BULK_MAX_ITEMS', 10000)
+
+# Rows per INSERT/UPDATE/DELETE statement and per primary key lookup
+BULK_BATCH_SIZE = getattr(settings, 'BULK_BATCH_SIZE', 500)
+
+
+class BulkResource:
+    """
+    How one model is written in bulk: the serializer that validates it, the field naming a
+    row, whether its rows feed dashboard_counters, and an optional prepare(item, instance)
+    hook run on each raw item (instance is None when creating)
+    """
+
+    def __init__(self, serializer_class, key, counted=False, prepare=None):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self.key = key
+        self.counted = counted
+        self.prepare = prepare
+
+    @property
+    def generated_key(self):
+        return isinstance(self.model._meta.pk, models.AutoField)
+
+    def payload_fields(self):
+        # The key is checked against the table in one query rather than by a validator per item
+        return [name for name in self.serializer_class.Meta.fields if name != self.key]
+
+
+def _prepare_salary(item, instance):
+    # As the single salary views do: fill in contributions the client left out
+    if instance is not None and 'basicsalary' not in item:
+        return item
+    try:
+        basic_salary = item.get('basicsalary', instance.basicsalary if instance is not None else 0)
+        fill_missing_contributions(item, basic_salary or 0)
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error pre-calculating EPF/ETF values: {str(e)}")
+    return item
+
+
+EMPLOYEE_DETAILS_BULK = BulkResource(EmployeeDetailsSerializer, 'eid', counted=True)
+LEAVE_BALANCES_BULK = BulkResource(EmployeeLeaveBalanceSerializer, 'eid')
+BANK_ACCOUNTS_BULK = BulkResource(BankAccountDetailsSerializer, 'eid')
+SALARIES_BULK = BulkResource(SalarySerializer, 'eid', counted=True, prepare=_prepare_salary)
+RESOURCE_ALLOCATIONS_BULK = BulkResource(ResourceAllocationSerializer, 'allocationid', counted=True)
+
+
+def _keys(resource, items, errors):
+    """
+    The primary key of each item (None where it is missing or invalid, with the error noted).
+    Delete requests may send bare keys instead of objects.
+    """
+    keys = []
+    seen = set()
+    for index, item in enumerate(items):
+        key = None
+        value = item.get(resource.key) if isinstance(item, dict) else item
+        try:
+            if value in (None, ''):
+                raise ValidationError('This field is required.')
+            key = resource.model._meta.pk.to_python(value)
+            if key in seen:
+                raise ValidationError('Appears more than once in this request.')
+            seen.add(key)
+        except ValidationError as e:
+            errors[index].setdefault(resource.key, []).extend(e.messages)
+            key = None
+        keys.append(key)
+    return keys
+
+
+def _existing(model, keys):
+    """
+    {pk: instance} for the keys that exist, looked up BULK_BATCH_SIZE at a time
+    """
+    pk = model._meta.pk
+    keys = [key for key in keys if key is not None]
+    found = {}
+    for start in range(0, len(keys), BULK_BATCH_SIZE):
+        # in_bulk() keys by what the driver returns, an int for the int(11) Eid columns behind
+        # text fields; normalise to the form _keys() gives
+        found.update((pk.to_python(key), instance)
+                     for key, instance in model.objects.in_bulk(keys[start:start + BULK_BATCH_SIZE]).items())
+    return found
+
+
+def _validate(resource, items, partial, errors):
+    """
+    Validate every item with one many=True serializer; returns the validated data, or None
+    with each item's field errors noted
+    """
+    serializer = resource.serializer_class(data=items, many=True, partial=partial, fields=resource.payload_fields())
+    if serializer.is_valid():
+        return serializer.validated_data
+    for index, item_errors in enumerate(serializer.errors):
+        for field, messages in item_errors.items():
+            errors[index].setdefault(field, []).extend(messages)
+    return None
+
+
+def _error_response(errors):
+    return Response({'errors': [{'index': index, 'errors': errors[index]} for index in sorted(errors)]},
+                    status=status.HTTP_400_BAD_REQUEST)
+
+
+def bulk_create(resource, items):
+    errors = defaultdict(dict)
+    if resource.prepare is not None:
+        items = [resource.prepare(dict(item), None) if isinstance(item, dict) else item for item in items]
+    keys = None if resource.generated_key else _keys(resource, items, errors)
+    validated = _validate(resource, items, False, errors)
+    if keys is not None:
+        existing = _existing(resource.model, keys)
+        for index, key in enumerate(keys):
+            if key in existing:
+                errors[index].setdefault(resource.key, []).append('Already exists.')
+    if errors:
+        return _error_response(errors)
+
+    instances = []
+    for index, data in enumerate(validated):
+        instance = resource.model(**data)
+        if keys is not None:
+            instance.pk = keys[index]
+        instances.append(instance)
+
+    with transaction.atomic():
+        resource.model.objects.bulk_create(instances, batch_size=BULK_BATCH_SIZE)
+        bump_table_versions(resource.model)
+        if resource.counted:
+            apply_dashboard_delta({}, sum_contributions(dashboard_contribution(instance) for instance in instances))
+    return Response({'created': len(instances)}, status=status.HTTP_201_CREATED)
+
+
+def bulk_update(resource, items, partial):
+    errors = defaultdict(dict)
+    keys = _keys(resource, items, errors)
+    instances = _existing(resource.model, keys)
+    for index, key in enumerate(keys):
+        if key is not None and key not in instances:
+            errors[index].setdefault(resource.key, []).append('Not found.')
+    if resource.prepare is not None:
+        items = [resource.prepare(dict(item), instances.get(key)) if isinstance(item, dict) else item
+                 for item, key in zip(items, keys)]
+    validated = _validate(resource, items, partial, errors)
+    if errors:
+        return _error_response(errors)
+
+    updated = []
+    changed = set()
+    before = []
+    for key, data in zip(keys, validated):
+        instance = instances[key]
+        if resource.counted:
+            before.append(dashboard_contribution(instance))
+        for field, value in data.items():
+            setattr(instance, field, value)
+        changed.update(data)
+        updated.append(instance)
+
+    with transaction.atomic():
+        if changed:
+            resource.model.objects.bulk_update(updated, sorted(changed), batch_size=BULK_BATCH_SIZE)
+        bump_table_versions(resource.model)
+        if resource.counted:
+            after = [dashboard_contribution(instance) for instance in updated]
+            apply_dashboard_delta(sum_contributions(before), sum_contributions(after))
+    return Response({'updated': len(updated)}, status=status.HTTP_200_OK)
+
+
+def bulk_delete(resource, items):
+    errors = defaultdict(dict)
+    keys = _keys(resource, items, errors)
+    instances = _existing(resource.model, keys)
+    for index, key in enumerate(keys):
+        if key is not None and key not in instances:
+            errors[index].setdefault(resource.key, []).append('Not found.')
+    if errors:
+        return _error_response(errors)
+
+    with transaction.atomic():
+        for start in range(0, len(keys), BULK_BATCH_SIZE):
+            resource.model.objects.filter(pk__in=keys[start:start + BULK_BATCH_SIZE]).delete()
+        bump_table_versions(resource.model)
+        if resource.counted:
+            before = [dashboard_contribution(instance) for instance in instances.values()]
+            apply_dashboard_delta(sum_contributions(before), {})
+    return Response({'deleted': len(keys)}, status=status.HTTP_200_OK)
+
+
+def bulk_response(request, resource):
+    """
+    Create (POST), update (PUT, or PATCH for partial updates) or delete (DELETE) a list of
+    rows in one transaction. Every item is validated first; if any fails, nothing is written
+    and the response lists each failing item's index and errors.
+    """
+    items = request.data
+    if not isinstance(items, list):
+        return Response({'error': 'Expected a list of objects'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > BULK_MAX_ITEMS:
+        return Response({'error': f'At most {BULK_MAX_ITEMS} items per request'}, status=status.HTTP_400_BAD_REQUEST)
+    if request.method == 'POST':
+        return bulk_create(resource, items)
+    if request.method in ('PUT', 'PATCH'):
+        return bulk_update(resource, items, partial=request.method == 'PATCH')
+    return bulk_delete(resource, items)
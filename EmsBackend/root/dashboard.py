@@ -0,0 +1,358 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Sum, Max, Q, F
+from django.db.models.functions import TruncDay, TruncWeek, TruncMonth
+from django.utils import timezone
+
+from .models import (Departments, Salary, SalaryPayments, TrainingBudget, TrainingRequest,
+                     LeaveApplications, ResourceAllocation, EmployeeDetails, DashboardCounters, DailyRollup)
+
+
+# Number of days counted as "recent" on the dashboard
+RECENT_ACTIVITY_DAYS = 30
+
+
+def aggregate_dashboard_counters(today=None):
+    """
+    Aggregate every dashboard figure with one conditional-aggregate query per table.
+    Keys match the DashboardCounters fields.
+    """
+    if today is None:
+        today = timezone.now().date()
+    thirty_days_ago = today - timedelta(days=RECENT_ACTIVITY_DAYS)
+
+    employees = EmployeeDetails.objects.aggregate(
+        total=Count('eid'),
+        active=Count('eid', filter=Q(status='Active')),
+    )
+
+    total_departments = Departments.objects.count()
+
+    salaries = Salary.objects.aggregate(total=Sum('netsalary'))
+
+    leaves = LeaveApplications.objects.aggregate(
+        total=Count('lid'),
+        pending=Count('lid', filter=Q(status='Pending')),
+        approved=Count('lid', filter=Q(status='Approved')),
+        rejected=Count('lid', filter=Q(status='Rejected')),
+        recent=Count('lid', filter=Q(fromdate__gte=thirty_days_ago)),
+    )
+
+    resources = ResourceAllocation.objects.aggregate(
+        total=Count('allocationid'),
+        allocated=Count('allocationid', filter=Q(collecteddate__isnull=True)),
+        returned=Count('allocationid', filter=Q(collecteddate__isnull=False)),
+    )
+
+    budgets = TrainingBudget.objects.aggregate(
+        total=Count('eid'),
+        amount=Sum('trainingbudgetamount'),
+        remaining=Sum('remainingamount'),
+    )
+
+    training_requests = TrainingRequest.objects.aggregate(
+        total=Count('*'),
+        pending=Count('eid', filter=Q(status='Pending')),
+        approved=Count('eid', filter=Q(status='Approved')),
+    )
+
+    recent_salary_payments = SalaryPayments.objects.filter(
+        paiddate__gte=thirty_days_ago
+    ).count()
+
+    return {
+        'total_employees': employees['total'],
+        'active_employees': employees['active'],
+        'total_departments': total_departments,
+        'total_salaries': salaries['total'] or Decimal('0'),
+        'leave_total': leaves['total'],
+        'leave_pending': leaves['pending'],
+        'leave_approved': leaves['approved'],
+        'leave_rejected': leaves['rejected'],
+        'leave_recent': leaves['recent'],
+        'resource_total': resources['total'],
+        'resource_allocated': resources['allocated'],
+        'resource_returned': resources['returned'],
+        'training_budgets': budgets['total'],
+        'training_budget_amount': budgets['amount'] or Decimal('0'),
+        'training_remaining_budget': budgets['remaining'] or Decimal('0'),
+        'training_requests': training_requests['total'],
+        'training_pending_requests': training_requests['pending'],
+        'training_approved_requests': training_requests['approved'],
+        'recent_salary_payments': recent_salary_payments,
+    }
+
+
+def format_dashboard_statistics(counters):
+    """
+    Shape the counters into the JSON returned by the dashboard endpoint
+    """
+    return {
+        'total_employees': counters['total_employees'],
+        'active_employees': counters['active_employees'],
+        'total_departments': counters['total_departments'],
+        'total_salaries': float(counters['total_salaries']),
+        'leave_summary': {
+            'total_applications': counters['leave_total'],
+            'pending': counters['leave_pending'],
+            'approved': counters['leave_approved'],
+            'rejected': counters['leave_rejected'],
+            'recent_applications': counters['leave_recent']
+        },
+        'resource_summary': {
+            'total_resources': counters['resource_total'],
+            'allocated': counters['resource_allocated'],
+            'returned': counters['resource_returned']
+        },
+        'training_summary': {
+            'total_budgets': counters['training_budgets'],
+            'total_requests': counters['training_requests'],
+            'pending_requests': counters['training_pending_requests'],
+            'approved_requests': counters['training_approved_requests'],
+            'total_budget_amount': float(counters['training_budget_amount']),
+            'remaining_budget': float(counters['training_remaining_budget'])
+        },
+        'recent_activities': {
+            'recent_leave_applications': counters['leave_recent'],
+            'recent_salary_payments': counters['recent_salary_payments']
+        }
+    }
+
+
+def collect_dashboard_statistics(today=None):
+    """
+    Compute the dashboard figures live from the fact tables
+    """
+    return format_dashboard_statistics(aggregate_dashboard_counters(today))
+
+
+def _recent_window_start():
+    return timezone.now().date() - timedelta(days=RECENT_ACTIVITY_DAYS)
+
+
+def _as_date(value):
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+
+def _is_recent(value):
+    value = _as_date(value)
+    return value is not None and value >= _recent_window_start()
+
+
+# What a single row adds to each counter in dashboard_counters
+_CONTRIBUTIONS = {
+    EmployeeDetails: lambda obj: {
+        'total_employees': 1,
+        'active_employees': int(obj.status == 'Active'),
+    },
+    Departments: lambda obj: {
+        'total_departments': 1,
+    },
+    Salary: lambda obj: {
+        'total_salaries': Decimal(obj.netsalary or 0),
+    },
+    LeaveApplications: lambda obj: {
+        'leave_total': 1,
+        'leave_pending': int(obj.status == 'Pending'),
+        'leave_approved': int(obj.status == 'Approved'),
+        'leave_rejected': int(obj.status == 'Rejected'),
+        'leave_recent': int(_is_recent(obj.fromdate)),
+    },
+    ResourceAllocation: lambda obj: {
+        'resource_total': 1,
+        'resource_allocated': int(obj.collecteddate is None),
+        'resource_returned': int(obj.collecteddate is not None),
+    },
+    TrainingBudget: lambda obj: {
+        'training_budgets': 1,
+        'training_budget_amount': Decimal(obj.trainingbudgetamount or 0),
+        'training_remaining_budget': Decimal(obj.remainingamount or 0),
+    },
+    TrainingRequest: lambda obj: {
+        'training_requests': 1,
+        'training_pending_requests': int(obj.status == 'Pending'),
+        'training_approved_requests': int(obj.status == 'Approved'),
+    },
+    SalaryPayments: lambda obj: {
+        'recent_salary_payments': int(_is_recent(obj.paiddate)),
+    },
+}
+
+
+def dashboard_contribution(instance):
+    """
+    Return the counter values a single row contributes, or an empty dict for no row
+    """
+    if instance is None:
+        return {}
+    return _CONTRIBUTIONS[type(instance)](instance)
+
+
+def sum_contributions(contributions):
+    """
+    Add up the contributions of many rows, for writing them with one counters update
+    """
+    total = {}
+    for contribution in contributions:
+        for field, value in contribution.items():
+            total[field] = total.get(field, 0) + value
+    return total
+
+
+def apply_dashboard_delta(before, after):
+    """
+    Move dashboard_counters from the contribution `before` a write to the one `after` it.
+    Call inside the write's transaction so the counters commit (or roll back) with it.
+    """
+    delta = {}
+    for field in set(before) | set(after):
+        change = after.get(field, 0) - before.get(field, 0)
+        if change:
+            delta[field] = change
+    if not delta:
+        return
+
+    updated = DashboardCounters.objects.filter(pk=DashboardCounters.SINGLETON_ID).update(
+        **{field: F(field) + change for field, change in delta.items()}
+    )
+    if not updated:
+        # No snapshot yet: build it from the tables, which already include this write
+        rebuild_dashboard_counters()
+
+
+@transaction.atomic
+def rebuild_dashboard_counters():
+    """
+    Recompute dashboard_counters from the fact tables, correcting any drift
+    and sliding the "recent" window forward
+    """
+    counters = aggregate_dashboard_counters()
+    counters['rebuilt_at'] = timezone.now()
+    snapshot, _ = DashboardCounters.objects.update_or_create(
+        pk=DashboardCounters.SINGLETON_ID, defaults=counters
+    )
+    return snapshot
+
+
+def read_dashboard_statistics():
+    """
+    Read the dashboard figures from the single dashboard_counters row
+    """
+    snapshot = DashboardCounters.objects.filter(pk=DashboardCounters.SINGLETON_ID).values().first()
+    if snapshot is None:
+        rebuild_dashboard_counters()
+        snapshot = DashboardCounters.objects.filter(pk=DashboardCounters.SINGLETON_ID).values().first()
+    return format_dashboard_statistics(snapshot)
+
+
+# Trend metrics served from dashboard_daily_rollups, with how each one is combined into a bucket.
+# Headcount is a level rather than a flow, so a bucket reports its peak daily snapshot.
+TREND_METRICS = {
+    'headcount': Max,
+    'payroll_spend': Sum,
+    'leave_days': Sum,
+    'resource_allocations': Sum,
+}
+
+TREND_BUCKETS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+@transaction.atomic
+def build_daily_rollups(from_date, to_date, today=None):
+    """
+    Recompute dashboard_daily_rollups for every day in [from_date, to_date] with one
+    grouped query per fact table. Headcount has no history in employeedetails, so it
+    is only snapshotted for `today` and kept as-is on earlier days.
+    """
+    if today is None:
+        today = timezone.now().date()
+
+    figures = {}
+
+    def add(day, **values):
+        figures.setdefault(day, {}).update(values)
+
+    payments = (SalaryPayments.objects
+                .filter(paiddate__range=(from_date, to_date))
+                .values('paiddate')
+                .annotate(spend=Sum('salary'), count=Count('paiddate')))
+    for row in payments:
+        add(row['paiddate'], payroll_spend=row['spend'] or Decimal('0'), salary_payments=row['count'])
+
+    leaves = (LeaveApplications.objects
+              .filter(fromdate__range=(from_date, to_date), status='Approved')
+              .values('fromdate')
+              .annotate(days=Sum('noofdays')))
+    for row in leaves:
+        add(row['fromdate'], leave_days=row['days'] or 0)
+
+    allocations = (ResourceAllocation.objects
+                   .filter(allocateddate__range=(from_date, to_date))
+                   .values('allocateddate')
+                   .annotate(count=Count('allocationid')))
+    for row in allocations:
+        add(row['allocateddate'], resource_allocations=row['count'])
+
+    if from_date <= today <= to_date:
+        add(today, headcount=EmployeeDetails.objects.filter(status='Active').count())
+
+    existing = {rollup.day: rollup for rollup in DailyRollup.objects.filter(day__range=(from_date, to_date))}
+    to_create = []
+    to_update = []
+    day = from_date
+    while day <= to_date:
+        values = figures.get(day, {})
+        rollup = existing.get(day)
+        if rollup is None:
+            rollup = DailyRollup(day=day)
+            to_create.append(rollup)
+        else:
+            to_update.append(rollup)
+        rollup.payroll_spend = values.get('payroll_spend', Decimal('0'))
+        rollup.salary_payments = values.get('salary_payments', 0)
+        rollup.leave_days = values.get('leave_days', 0)
+        rollup.resource_allocations = values.get('resource_allocations', 0)
+        if 'headcount' in values:
+            rollup.headcount = values['headcount']
+        day += timedelta(days=1)
+
+    DailyRollup.objects.bulk_create(to_create, batch_size=500)
+    DailyRollup.objects.bulk_update(
+        to_update,
+        ['headcount', 'payroll_spend', 'salary_payments', 'leave_days', 'resource_allocations'],
+        batch_size=500,
+    )
+    return len(to_create) + len(to_update)
+
+
+def trend_series(metric, bucket, from_date, to_date):
+    """
+    Return [{'period': ..., 'value': ...}] for a metric, bucketed by day, week or month.
+    Reads only dashboard_daily_rollups.
+    """
+    aggregate = TREND_METRICS[metric]
+    rows = (DailyRollup.objects
+            .filter(day__range=(from_date, to_date))
+            .annotate(period=TREND_BUCKETS[bucket]('day'))
+            .values('period')
+            .annotate(value=aggregate(metric))
+            .order_by('period'))
+
+    series = []
+    for row in rows:
+        if row['value'] is None:
+            continue
+        value = row['value']
+        series.append({
+            'period': _as_date(row['period']).isoformat(),
+            'value': float(value) if isinstance(value, Decimal) else value
+        })
+    return series
@@ -0,0 +1,129 @@
+import csv
+from decimal import Decimal
+
+from django.db import connection
+
+
+# Rows fetched from the cursor per round trip while streaming
+STREAM_CHUNK_SIZE = 2000
+
+# LEFT JOIN, so a payment without a bank account is seen rather than silently left out
+BANK_FILE_QUERY = """
+    SELECT b.Eid, b.BankName, b.BankBranchName, b.BankAccountHolderName, b.BankAccNo, p.Eid, p.Salary
+    FROM salarypayments p
+    LEFT JOIN bankaccountdetails b ON b.Eid = p.Eid
+    WHERE p.PaidDate = %s
+    ORDER BY b.BankName, b.BankBranchName, p.Eid
+"""
+
+MISSING_BANK_ACCOUNTS_QUERY = """
+    SELECT p.Eid
+    FROM salarypayments p
+    LEFT JOIN bankaccountdetails b ON b.Eid = p.Eid
+    WHERE p.PaidDate = %s AND b.Eid IS NULL
+    ORDER BY p.Eid
+"""
+
+BANK_FILE_COLUMNS = ['BankName', 'BankBranchName', 'BankAccountHolderName', 'BankAccNo', 'Eid', 'Amount', 'PaymentDate']
+
+
+def stream_rows(sql, params, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield rows one at a time, using a server-side cursor on MySQL so the
+    result set is never buffered in full
+    """
+    if connection.vendor == 'mysql':
+        from MySQLdb.cursors import SSCursor
+        connection.ensure_connection()
+        cursor = connection.connection.cursor(SSCursor)
+    else:
+        cursor = connection.cursor()
+    try:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cursor.close()
+
+
+def payments_without_bank_account(payment_date):
+    """
+    Eids paid on payment_date that have no bankaccountdetails row; a bank file for that
+    date would leave their salaries out
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(MISSING_BANK_ACCOUNTS_QUERY, [payment_date])
+        return [str(eid) for eid, in cursor.fetchall()]
+
+
+def _bank_file_rows(payment_date):
+    for account_eid, bank, branch, holder, account, eid, amount in stream_rows(BANK_FILE_QUERY, [payment_date]):
+        if account_eid is None:
+            # The account went away after payments_without_bank_account() was checked; stop
+            # before the trailer rather than finish a file that looks complete
+            raise ValueError(f'Employee {eid} has no bank account')
+        yield bank, branch, holder, account, eid, amount
+
+
+class _EchoBuffer:
+    """File-like object whose write() hands the line straight back to csv.writer's caller"""
+
+    def write(self, value):
+        return value
+
+
+def bank_file_csv(payment_date):
+    """
+    Stream the bank transfer file for payment_date as CSV lines, grouped by bank and branch.
+    Check payments_without_bank_account() first.
+    """
+    writer = csv.writer(_EchoBuffer())
+    yield writer.writerow(BANK_FILE_COLUMNS)
+    date_str = payment_date.isoformat()
+    for bank, branch, holder, account, eid, amount in _bank_file_rows(payment_date):
+        yield writer.writerow([bank, branch, holder, account, eid, "{:.2f}".format(amount or 0), date_str])
+
+
+def _fixed(value, width, numeric=False):
+    value = '' if value is None else str(value)
+    if numeric:
+        return value.rjust(width, '0')[-width:]
+    return value.ljust(width)[:width]
+
+
+def _cents(amount):
+    return int((Decimal(amount or 0) * 100).to_integral_value())
+
+
+def bank_file_fixed_width(payment_date):
+    """
+    Stream the bank transfer file for payment_date as fixed-width records:
+    H header, D detail per payment, T trailer per bank branch and F file trailer.
+    Amounts are in cents. Check payments_without_bank_account() first.
+    """
+    date_str = payment_date.strftime('%Y%m%d')
+    yield 'H' + date_str + '\r\n'
+
+    group = None
+    group_count = group_total = 0
+    file_count = file_total = 0
+    for bank, branch, holder, account, eid, amount in _bank_file_rows(payment_date):
+        if group is not None and group != (bank, branch):
+            yield 'T' + _fixed(group[0], 30) + _fixed(group[1], 30) + _fixed(group_count, 8, True) + _fixed(group_total, 15, True) + '\r\n'
+            group_count = group_total = 0
+        group = (bank, branch)
+
+        cents = _cents(amount)
+        group_count += 1
+        group_total += cents
+        file_count += 1
+        file_total += cents
+        yield ('D' + _fixed(bank, 30) + _fixed(branch, 30) + _fixed(account, 20) + _fixed(holder, 40)
+               + _fixed(eid, 10) + _fixed(cents, 15, True) + date_str + '\r\n')
+
+    if group is not None:
+        yield 'T' + _fixed(group[0], 30) + _fixed(group[1], 30) + _fixed(group_count, 8, True) + _fixed(group_total, 15, True) + '\r\n'
+    yield 'F' + _fixed(file_count, 8, True) + _fixed(file_total, 15, True) + '\r\n'
@@ -0,0 +1,243 @@
+import codecs
+import csv
+import re
+import tempfile
+import uuid
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from rest_framework import serializers
+
+from .dashboard import apply_dashboard_delta, dashboard_contribution, sum_contributions
+from .models import EmployeeDetails
+from .serializers import EmployeeDetailsSerializer
+from .versioning import bump_table_versions
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+
+# Rows validated and inserted per transaction; override with IMPORT_CHUNK_SIZE in settings
+IMPORT_CHUNK_SIZE = getattr(settings, 'IMPORT_CHUNK_SIZE', 1000)
+
+# Errors returned inline with the summary; the report holds all of them
+IMPORT_ERROR_PREVIEW = 20
+
+# Where error reports are kept in default_storage
+IMPORT_REPORT_DIR = 'import_reports'
+
+# Everything the serializer takes except the key, which is read-only there and checked here
+PAYLOAD_FIELDS = [name for name in EmployeeDetailsSerializer.Meta.fields if name != 'eid']
+
+# employeedetails.Eid is int(11), though the model declares it as text
+EID_FIELD = serializers.IntegerField(min_value=1, max_value=2 ** 31 - 1)
+
+
+class ImportInterrupted(ValueError):
+    """
+    The upload could not be read past `row`. Chunks before it may already be committed;
+    `summary` counts them like a finished import.
+    """
+
+    def __init__(self, message, row):
+        super().__init__(message)
+        self.row = row
+        self.summary = {'imported': 0, 'failed': 0, 'errors': [], 'report_id': None}
+
+
+def _header_key(name):
+    # 'Full Name', 'full_name' and 'FullName' all name the fullname field
+    return re.sub(r'[^a-z0-9]', '', str(name or '').lower())
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.date().isoformat() if value.time() == datetime.min.time() else value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        # Spreadsheets store whole numbers, such as Eids, as floats
+        return str(int(value))
+    return str(value).strip()
+
+
+def _csv_rows(upload):
+    # UploadedFile iterates line by line, from memory or from its temporary file
+    try:
+        # strict: a stray or unterminated quote is an error, not a silently merged field
+        for row in csv.reader(codecs.iterdecode(upload, 'utf-8-sig'), strict=True):
+            yield [_cell(value) for value in row]
+    except csv.Error as e:
+        # e.g. bad quoting or a field over csv.field_size_limit()
+        raise ValueError(f'Could not read the CSV file: {e}')
+
+
+def _xlsx_rows(upload):
+    if openpyxl is None:
+        raise ValueError('XLSX import needs openpyxl installed; upload a CSV file instead')
+    # read_only streams the first sheet's rows instead of loading the whole workbook
+    try:
+        workbook = openpyxl.load_workbook(upload, read_only=True, data_only=True)
+    except Exception as e:
+        raise ValueError(f'Could not read the XLSX file: {e}')
+    try:
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield [_cell(value) for value in row]
+    finally:
+        workbook.close()
+
+
+def upload_rows(upload):
+    """
+    Rows of cell strings from a .csv or .xlsx upload, read as a stream
+    """
+    name = upload.name.lower()
+    if name.endswith('.csv'):
+        return _csv_rows(upload)
+    if name.endswith('.xlsx'):
+        return _xlsx_rows(upload)
+    raise ValueError('Upload a .csv or .xlsx file')
+
+
+def upload_records(rows):
+    """
+    (row number, {field: value}) for each data row, keyed by the serializer field each header
+    names. Empty cells are left out so defaults and required checks apply; unknown columns are ignored.
+    Raises ImportInterrupted when a data row cannot be read.
+    """
+    header = next(rows, None)
+    if header is None:
+        raise ValueError('The file is empty')
+    fields = {_header_key(name): name for name in EmployeeDetailsSerializer.Meta.fields}
+    columns = [fields.get(_header_key(name)) for name in header]
+    if 'eid' not in columns:
+        raise ValueError('The file needs an Eid column')
+    number = 1
+    try:
+        for number, row in enumerate(rows, start=2):
+            record = {column: value for column, value in zip(columns, row) if column and value != ''}
+            if record:
+                yield number, record
+    except ValueError as e:
+        raise ImportInterrupted(f'Row {number + 1}: {e}', number + 1)
+
+
+def _import_chunk(chunk, validator, eids, emails):
+    """
+    Validate and insert one chunk of records. eids and emails hold everything already in the
+    table or imported so far, and gain the rows inserted here.
+    Returns (rows inserted, [(row number, eid, {field: [messages]})]).
+    """
+    instances = []
+    errors = []
+    for number, record in chunk:
+        row_errors = {}
+        eid = record.get('eid', '')
+        try:
+            # As the text the model holds, so '007' and '7' are the same employee
+            eid = str(EID_FIELD.run_validation(eid))
+            if eid in eids:
+                row_errors['eid'] = ['An employee with this Eid already exists.']
+        except serializers.ValidationError as e:
+            row_errors['eid'] = [str(message) for message in e.detail]
+        email = record.get('email', '').lower()
+        if email and email in emails:
+            row_errors['email'] = ['An employee with this email already exists.']
+        try:
+            data = validator.run_validation({field: value for field, value in record.items() if field != 'eid'})
+        except serializers.ValidationError as e:
+            for field, messages in e.detail.items():
+                row_errors.setdefault(field, []).extend(str(message) for message in messages)
+        if row_errors:
+            errors.append((number, record.get('eid', ''), row_errors))
+            continue
+        # Reserve the keys now so later rows in the file clash with this one
+        eids.add(eid)
+        if email:
+            emails.add(email)
+        instances.append(EmployeeDetails(eid=eid, **data))
+
+    if instances:
+        with transaction.atomic():
+            EmployeeDetails.objects.bulk_create(instances, batch_size=IMPORT_CHUNK_SIZE)
+            bump_table_versions(EmployeeDetails)
+            apply_dashboard_delta({}, sum_contributions(dashboard_contribution(instance) for instance in instances))
+    return len(instances), errors
+
+
+def import_report_path(report_id):
+    return f'{IMPORT_REPORT_DIR}/{report_id}.csv'
+
+
+def import_employee_details(upload):
+    """
+    Import employee details from a CSV or XLSX upload. Rows are read as a stream, validated
+    with the EmployeeDetailsSerializer rules IMPORT_CHUNK_SIZE at a time, checked against one
+    preloaded set of Eids and emails, and each chunk's valid rows are inserted in one
+    transaction; invalid rows are skipped and written to an error report.
+    Returns {'imported', 'failed', 'errors' (the first few), 'report_id' (None without errors)}.
+    Raises ValueError for a file that cannot be read at all, and ImportInterrupted, carrying
+    that summary, when it stops being readable part-way through.
+    """
+    records = upload_records(upload_rows(upload))
+    # Read the first row before loading the existing keys, so a bad file fails fast
+    first = next(records, None)
+
+    eids = set()
+    emails = set()
+    for eid, email in EmployeeDetails.objects.values_list('eid', 'email').iterator(chunk_size=10000):
+        # The driver returns the int column's values as ints
+        eids.add(str(eid))
+        if email:
+            emails.add(email.lower())
+
+    validator = EmployeeDetailsSerializer(fields=PAYLOAD_FIELDS)
+    imported = 0
+    failed = 0
+    preview = []
+    # Kept in memory until it grows past 1MB, then on disk
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024, mode='w+', newline='') as report:
+        writer = csv.writer(report)
+        writer.writerow(['row', 'eid', 'field', 'error'])
+
+        def flush(chunk):
+            nonlocal imported, failed
+            inserted, errors = _import_chunk(chunk, validator, eids, emails)
+            imported += inserted
+            failed += len(errors)
+            for number, eid, row_errors in errors:
+                if len(preview) < IMPORT_ERROR_PREVIEW:
+                    preview.append({'row': number, 'eid': eid, 'errors': row_errors})
+                for field, messages in row_errors.items():
+                    writer.writerow([number, eid, field, ' '.join(messages)])
+
+        interrupted = None
+        chunk = [first] if first is not None else []
+        try:
+            for record in records:
+                chunk.append(record)
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    flush(chunk)
+                    chunk = []
+        except ImportInterrupted as e:
+            # Still import the rows before it, so the file can be resumed from e.row
+            interrupted = e
+        if chunk:
+            flush(chunk)
+
+        report_id = None
+        if failed:
+            report_id = str(uuid.uuid4())
+            default_storage.save(import_report_path(report_id), File(report))
+    summary = {'imported': imported, 'failed': failed, 'errors': preview, 'report_id': report_id}
+    if interrupted is not None:
+        interrupted.summary = summary
+        raise interrupted
+    return summary
@@ -0,0 +1,64 @@
+import time
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from root.models import EmployeeDetails, Salary, SalaryPayments, LeaveApplications
+from root.parsers import ORJSONParser
+from root.renderers import ORJSONRenderer
+from root.serializers import (EmployeeDetailsSerializer, SalarySerializer, SalaryPaymentsSerializer,
+                              LeaveApplicationsSerializer)
+from .benchmark_serialization import sample_values
+
+
+# The heaviest list endpoints and the serializers behind them
+ENDPOINTS = [
+    ('/employee_details/', EmployeeDetails, EmployeeDetailsSerializer),
+    ('/salary/', Salary, SalarySerializer),
+    ('/salary_payments/', SalaryPayments, SalaryPaymentsSerializer),
+    ('/leave_applications/', LeaveApplications, LeaveApplicationsSerializer),
+]
+
+
+def _best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Command(BaseCommand):
+    help = ("Render and parse the payloads of the heaviest list endpoints with the stdlib "
+            "JSON renderer/parser and the orjson ones, and check the rendered bytes match.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Rows per payload (default: 10000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Best of this many runs (default: 5)')
+
+    def handle(self, *args, **options):
+        stdlib_renderer, orjson_renderer = JSONRenderer(), ORJSONRenderer()
+        stdlib_parser, orjson_parser = JSONParser(), ORJSONParser()
+        repeat = options['repeat']
+        for url, model, serializer_class in ENDPOINTS:
+            attnames = [field.attname for field in model._meta.concrete_fields]
+            instances = [model.from_db('default', attnames, row) for row in sample_values(model, options['rows'])]
+            data = serializer_class(instances, many=True).data
+
+            rendered = stdlib_renderer.render(data)
+            render_stdlib = _best_of(repeat, lambda: stdlib_renderer.render(data))
+            render_orjson = _best_of(repeat, lambda: orjson_renderer.render(data))
+            parse_stdlib = _best_of(repeat, lambda: stdlib_parser.parse(BytesIO(rendered)))
+            parse_orjson = _best_of(repeat, lambda: orjson_parser.parse(BytesIO(rendered)))
+
+            identical = orjson_renderer.render(data) == rendered
+            self.stdout.write(
+                f"{url:<22} {len(rendered) / 1024:8.0f} KiB  "
+                f"render {render_stdlib * 1000:7.1f}ms -> {render_orjson * 1000:6.1f}ms  "
+                f"parse {parse_stdlib * 1000:7.1f}ms -> {parse_orjson * 1000:6.1f}ms  "
+                f"identical bytes: {'yes' if identical else 'NO'}"
+            )
@@ -0,0 +1,78 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import models
+from rest_framework.renderers import JSONRenderer
+
+from root.encoders import row_encoder
+from root.models import EmployeeDetails, LeaveApplications
+from root.serializers import EmployeeDetailsSerializer, LeaveApplicationsSerializer
+
+
+BENCHMARKS = [
+    (EmployeeDetails, EmployeeDetailsSerializer),
+    (LeaveApplications, LeaveApplicationsSerializer),
+]
+
+
+def _sample_value(field, i):
+    if field.primary_key:
+        return i if isinstance(field, (models.AutoField, models.IntegerField)) else f'{field.name}-{i}'
+    if field.null and i % 5 == 0:
+        return None
+    if field.choices:
+        return field.choices[i % len(field.choices)][0]
+    if isinstance(field, models.DateField):
+        return date(2020, 1, 1) + timedelta(days=i % 3650)
+    if isinstance(field, models.IntegerField):
+        return i
+    if isinstance(field, models.DecimalField):
+        return Decimal(i) / 100
+    return f'{field.name}-{i}'
+
+
+def sample_values(model, count):
+    """
+    Synthetic rows for model, as value lists in concrete field order
+    """
+    return [[_sample_value(field, i) for field in model._meta.concrete_fields] for i in range(count)]
+
+
+class Command(BaseCommand):
+    help = ("Compare ModelSerializer against the values_list() row encoders on synthetic rows, "
+            "and check both render to the same JSON bytes.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000],
+                            help='Row counts to benchmark (default: 10000 100000)')
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        for model, serializer_class in BENCHMARKS:
+            columns, encode = row_encoder(serializer_class)
+            concrete = model._meta.concrete_fields
+            attnames = [field.attname for field in concrete]
+            for count in options['rows']:
+                values = sample_values(model, count)
+                by_name = [dict(zip(attnames, row)) for row in values]
+                tuples = [tuple(row[column] for column in columns) for row in by_name]
+
+                # What a queryset plus ModelSerializer does: build instances, then serialize them
+                started = time.perf_counter()
+                instances = [model.from_db('default', attnames, row) for row in values]
+                serialized = serializer_class(instances, many=True).data
+                serializer_seconds = time.perf_counter() - started
+
+                started = time.perf_counter()
+                encoded = [encode(row) for row in tuples]
+                encoder_seconds = time.perf_counter() - started
+
+                identical = renderer.render(serialized) == renderer.render(encoded)
+                self.stdout.write(
+                    f"{serializer_class.__name__:<32} {count:>7} rows  "
+                    f"serializer {serializer_seconds:8.3f}s  encoder {encoder_seconds:8.3f}s  "
+                    f"speedup {serializer_seconds / encoder_seconds:6.1f}x  "
+                    f"identical JSON: {'yes' if identical else 'NO'}"
+                )
@@ -0,0 +1,30 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from root.dashboard import build_daily_rollups
+
+
+class Command(BaseCommand):
+    help = ("Fill dashboard_daily_rollups from the fact tables. "
+            "Defaults to yesterday and today; pass --from/--to to backfill history.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='from_date', help='First day to roll up (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='to_date', help='Last day to roll up (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        try:
+            to_date = date.fromisoformat(options['to_date']) if options['to_date'] else today
+            from_date = date.fromisoformat(options['from_date']) if options['from_date'] else to_date - timedelta(days=1)
+        except ValueError as e:
+            raise CommandError(f"Invalid date: {e}")
+        if from_date > to_date:
+            raise CommandError("--from must not be after --to")
+
+        days = build_daily_rollups(from_date, to_date)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled up {days} day(s) from {from_date.isoformat()} to {to_date.isoformat()}"
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from root.dashboard import rebuild_dashboard_counters
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the dashboard_counters snapshot from the fact tables. "
+            "Run daily (e.g. from cron) to correct drift and slide the 30-day window.")
+
+    def handle(self, *args, **options):
+        snapshot = rebuild_dashboard_counters()
+        self.stdout.write(self.style.SUCCESS(
+            f"Dashboard counters rebuilt at {snapshot.rebuilt_at.isoformat()}"
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from root.mass_payment import process_payroll_run
+from root.models import PayrollRun
+
+
+class Command(BaseCommand):
+    help = "Resume an unfinished payroll run from its last committed checkpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument('run_id', type=int)
+
+    def handle(self, *args, **options):
+        if not PayrollRun.objects.filter(pk=options['run_id']).exists():
+            raise CommandError(f"No payroll run found with ID {options['run_id']}")
+
+        run = process_payroll_run(options['run_id'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Payroll run {run.id} {run.status.lower()}: {run.successcount} paid, "
+            f"{len(run.failedpayments)} failed, total {run.totalamount}"
+        ))
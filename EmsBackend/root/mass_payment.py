@@ -0,0 +1,265 @@
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum, Q, Exists, OuterRef, Subquery
+from django.utils import timezone
+
+from .dashboard import dashboard_contribution, apply_dashboard_delta
+from .models import Salary, SalaryPayments, PayrollRun, BankAccountDetails, EmployeeDetails
+from .versioning import bump_table_versions
+
+
+# Rows per INSERT when writing payments; override with MASS_PAYMENT_BATCH_SIZE in settings
+DEFAULT_BATCH_SIZE = getattr(settings, 'MASS_PAYMENT_BATCH_SIZE', 1000)
+
+# Employees per committed chunk of a payroll run; override with PAYROLL_CHUNK_SIZE in settings
+DEFAULT_CHUNK_SIZE = getattr(settings, 'PAYROLL_CHUNK_SIZE', 5000)
+
+# Chunk timings a run keeps, the most recent ones; override with PAYROLL_MAX_CHUNK_TIMINGS in settings
+MAX_CHUNK_TIMINGS = getattr(settings, 'PAYROLL_MAX_CHUNK_TIMINGS', 100)
+
+# The columns a checkpoint moves; employeeids is frozen and never rewritten
+CHECKPOINT_FIELDS = ['processedemployees', 'successcount', 'totalamount', 'chunktimings', 'status', 'finishedat',
+                     'error']
+
+
+def plan_mass_payment(payment_date, employee_ids=None):
+    """
+    Work out which employees can be paid on payment_date with two queries:
+    one for the salary records and one duplicate check for all of them.
+    Returns (payments to insert, failed list).
+    """
+    salaries = Salary.objects.all()
+    if employee_ids is not None:
+        salaries = salaries.filter(eid__in=employee_ids)
+    net_salaries = {str(eid): netsalary for eid, netsalary in salaries.values_list('eid', 'netsalary')}
+
+    if employee_ids is None:
+        employee_ids = list(net_salaries)
+
+    already_paid = set(
+        str(eid) for eid in SalaryPayments.objects.filter(
+            paiddate=payment_date, eid__in=list(net_salaries)
+        ).values_list('eid', flat=True)
+    )
+
+    payments = []
+    failed_list = []
+    for eid in employee_ids:
+        key = str(eid)
+        if key not in net_salaries:
+            failed_list.append({
+                'eid': eid,
+                'error': 'No salary record found for this employee'
+            })
+        elif key in already_paid:
+            failed_list.append({
+                'eid': eid,
+                'error': 'Payment already exists for this date'
+            })
+        elif net_salaries[key] is None:
+            failed_list.append({
+                'eid': eid,
+                'error': 'No net salary set for this employee'
+            })
+        else:
+            payments.append(SalaryPayments(eid_id=key, salary=net_salaries[key], paiddate=payment_date))
+            # A repeated id in the request is a duplicate of the payment just planned
+            already_paid.add(key)
+
+    return payments, failed_list
+
+
+def insert_payments(payments, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Insert planned payments in batches and move the dashboard counters with them.
+    Call inside a transaction.
+    """
+    SalaryPayments.objects.bulk_create(payments, batch_size=batch_size)
+    if payments:
+        contribution = dashboard_contribution(payments[0])
+        apply_dashboard_delta({}, {field: value * len(payments) for field, value in contribution.items()})
+        bump_table_versions(SalaryPayments)
+    return sum((payment.salary for payment in payments), Decimal('0'))
+
+
+def preview_mass_payment(payment_date, employee_ids=None):
+    """
+    What a mass payment for payment_date would do, without writing anything:
+    totals per department and the employees that would be skipped or need attention.
+    Runs as joined aggregate queries over salary, salarypayments, bankaccountdetails
+    and employeedetails.
+    """
+    salaries = Salary.objects.all()
+    if employee_ids is not None:
+        salaries = salaries.filter(eid__in=employee_ids)
+    salaries = salaries.annotate(
+        department=Subquery(EmployeeDetails.objects.filter(eid=OuterRef('eid')).values('department')[:1]),
+        already_paid=Exists(SalaryPayments.objects.filter(eid=OuterRef('eid'), paiddate=payment_date)),
+        has_bank_account=Exists(BankAccountDetails.objects.filter(eid=OuterRef('eid'))),
+    )
+    payable = Q(already_paid=False, netsalary__isnull=False)
+
+    departments = []
+    totals = {'employees': 0, 'payable': 0, 'amount': Decimal('0')}
+    rows = (salaries
+            .values('department')
+            .annotate(
+                employees=Count('eid'),
+                payable=Count('eid', filter=payable),
+                amount=Sum('netsalary', filter=payable),
+                duplicates=Count('eid', filter=Q(already_paid=True)),
+                missing_bank_account=Count('eid', filter=Q(has_bank_account=False)),
+                null_net_salary=Count('eid', filter=Q(netsalary__isnull=True)),
+            )
+            .order_by('department'))
+    for row in rows:
+        amount = row['amount'] or Decimal('0')
+        totals['employees'] += row['employees']
+        totals['payable'] += row['payable']
+        totals['amount'] += amount
+        departments.append({
+            'department': row['department'],
+            'employees': row['employees'],
+            'payable_count': row['payable'],
+            'total_amount': float(amount),
+            'duplicates': row['duplicates'],
+            'missing_bank_account': row['missing_bank_account'],
+            'null_net_salary': row['null_net_salary']
+        })
+
+    duplicates = []
+    missing_bank_account = []
+    null_net_salary = []
+    flagged = (salaries
+               .filter(Q(already_paid=True) | Q(has_bank_account=False) | Q(netsalary__isnull=True))
+               .order_by('eid')
+               .values_list('eid', 'already_paid', 'has_bank_account', 'netsalary'))
+    for eid, already_paid, has_bank_account, netsalary in flagged:
+        # salary.Eid is an int column; report Eids as text, like missing_salary_record
+        eid = str(eid)
+        if already_paid:
+            duplicates.append(eid)
+        if not has_bank_account:
+            missing_bank_account.append(eid)
+        if netsalary is None:
+            null_net_salary.append(eid)
+
+    missing_salary_record = []
+    if employee_ids is not None:
+        found = set(str(eid) for eid in salaries.values_list('eid', flat=True))
+        missing_salary_record = [eid for eid in employee_ids if str(eid) not in found]
+
+    return {
+        'payment_date': payment_date.isoformat(),
+        'total_employees': totals['employees'],
+        'payable_count': totals['payable'],
+        'total_amount': float(totals['amount']),
+        'departments': departments,
+        'duplicates': duplicates,
+        'missing_bank_account': missing_bank_account,
+        'null_net_salary': null_net_salary,
+        'missing_salary_record': missing_salary_record
+    }
+
+
+def start_payroll_run(payment_date, employee_ids=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                      batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Create a payroll run, freezing the list of employees it will pay
+    """
+    if employee_ids is None:
+        employee_ids = [str(eid) for eid in Salary.objects.order_by('eid').values_list('eid', flat=True)]
+
+    return PayrollRun.objects.create(
+        paymentdate=payment_date,
+        employeeids=[str(eid) for eid in employee_ids],
+        chunksize=chunk_size,
+        batchsize=batch_size,
+    )
+
+
+def process_payroll_run(run_id):
+    """
+    Pay a run chunk by chunk from its last checkpoint. Each chunk's payments and the
+    advanced checkpoint commit in one transaction, so a killed worker can call this
+    again and carry on without paying anyone twice.
+    """
+    try:
+        while True:
+            started = time.monotonic()
+            with transaction.atomic():
+                # Lock the run so two workers cannot process the same chunk
+                run = PayrollRun.objects.select_for_update().get(pk=run_id)
+                if run.status == 'Completed':
+                    return run
+
+                start = run.processedemployees
+                chunk = run.employeeids[start:start + run.chunksize]
+                update_fields = list(CHECKPOINT_FIELDS)
+                if chunk:
+                    payments, failed_list = plan_mass_payment(run.paymentdate, chunk)
+                    amount = insert_payments(payments, run.batchsize)
+
+                    run.processedemployees = start + len(chunk)
+                    run.successcount += len(payments)
+                    if failed_list:
+                        run.failedpayments = run.failedpayments + failed_list
+                        update_fields.append('failedpayments')
+                    run.totalamount += amount
+                    number = run.chunktimings[-1]['chunk'] + 1 if run.chunktimings else 1
+                    run.chunktimings = (run.chunktimings + [{
+                        'chunk': number,
+                        'employees': len(chunk),
+                        'seconds': round(time.monotonic() - started, 3)
+                    }])[-MAX_CHUNK_TIMINGS:]
+
+                if run.processedemployees >= len(run.employeeids):
+                    run.status = 'Completed'
+                    run.finishedat = timezone.now()
+                else:
+                    run.status = 'Running'
+                run.error = None
+                run.save(update_fields=update_fields)
+
+            if run.status == 'Completed':
+                return run
+    except Exception as e:
+        # The failed chunk rolled back; keep the checkpoint so a retry resumes from it
+        try:
+            PayrollRun.objects.filter(pk=run_id).update(status='Failed', error=str(e)[:500])
+        except Exception:
+            # The connection may be what failed; never let this hide the original error
+            import logging
+            logger = logging.getLogger(__name__)
+            logger.exception(f"Could not mark payroll run {run_id} as failed")
+        raise
+
+
+def payroll_run_status(run):
+    """
+    Progress, throughput and per-chunk timings for a payroll run
+    """
+    total = len(run.employeeids)
+    # Over the chunks still kept, the most recent MAX_CHUNK_TIMINGS
+    seconds = sum(chunk['seconds'] for chunk in run.chunktimings)
+    timed = sum(chunk['employees'] for chunk in run.chunktimings)
+    return {
+        'run_id': run.id,
+        'status': run.status,
+        'payment_date': run.paymentdate.isoformat(),
+        'total_employees': total,
+        'processed_employees': run.processedemployees,
+        'progress': round(100.0 * run.processedemployees / total, 2) if total else 100.0,
+        'success_count': run.successcount,
+        'failed_count': len(run.failedpayments),
+        'failed_payments': run.failedpayments,
+        'total_amount': float(run.totalamount),
+        'throughput': round(timed / seconds, 2) if seconds else None,
+        'chunks': run.chunktimings,
+        'error': run.error,
+        'started_at': run.startedat.isoformat(),
+        'finished_at': run.finishedat.isoformat() if run.finishedat else None
+    }
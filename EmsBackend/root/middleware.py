@@ -0,0 +1,139 @@
+from itertools import chain
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Responses smaller than this are sent as they are; override with COMPRESSION_MIN_SIZE in settings
+COMPRESSION_MIN_SIZE = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+
+# Brotli quality (0-11); the middle of the range is fast enough for dynamic responses
+COMPRESSION_BROTLI_QUALITY = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5)
+
+# Bodies that are already compressed
+INCOMPRESSIBLE_CONTENT_TYPES = ('image/', 'video/', 'audio/', 'application/zip', 'application/gzip',
+                                'application/vnd.apache.parquet')
+
+
+def accepted_encodings(header):
+    """
+    {coding: q} from an Accept-Encoding header
+    """
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(header):
+    """
+    'br' or 'gzip', whichever the client prefers (brotli on a tie), or None
+    """
+    accepted = accepted_encodings(header)
+    best, best_quality = None, 0.0
+    for coding in (['br'] if brotli is not None else []) + ['gzip']:
+        quality = accepted.get(coding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def _brotli_sequence(chunks):
+    compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+    for chunk in chunks:
+        # Flush every chunk so a streamed body reaches the client as it is produced
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def _peek(chunks, size):
+    """
+    Read chunks until at least size bytes are in hand; returns (head, exhausted)
+    """
+    head = []
+    total = 0
+    for chunk in chunks:
+        head.append(chunk)
+        total += len(chunk)
+        if total >= size:
+            return head, False
+    return head, True
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli or gzip, as negotiated through Accept-Encoding, once
+    they reach COMPRESSION_MIN_SIZE bytes. Streaming responses are compressed chunk by
+    chunk; only enough of the stream to decide on the threshold is read up front.
+    """
+
+    # BREACH mitigation, as in Django's GZipMiddleware
+    max_random_bytes = 100
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.has_header('Content-Encoding') or getattr(response, 'is_async', False):
+            return response
+        if response.get('Content-Type', '').startswith(INCOMPRESSIBLE_CONTENT_TYPES):
+            return response
+        if not response.streaming and len(response.content) < COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            chunks = iter(response.streaming_content)
+            head, exhausted = _peek(chunks, COMPRESSION_MIN_SIZE)
+            if exhausted:
+                response.streaming_content = head
+                return response
+            chunks = chain(head, chunks)
+            if encoding == 'br':
+                response.streaming_content = _brotli_sequence(chunks)
+            else:
+                response.streaming_content = compress_sequence(chunks, max_random_bytes=self.max_random_bytes)
+            del response.headers['Content-Length']
+        else:
+            if encoding == 'br':
+                compressed = brotli.compress(response.content, quality=COMPRESSION_BROTLI_QUALITY)
+            else:
+                compressed = compress_string(response.content, max_random_bytes=self.max_random_bytes)
+            # Only worth it if it is actually smaller
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # A compressed body is a different representation, so a strong ETag becomes weak
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('root', '0007_employeeleavebalance_leaveapplications_leavetype'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounters',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(default=1, primary_key=True, serialize=False)),
+                ('total_employees', models.IntegerField(default=0)),
+                ('active_employees', models.IntegerField(default=0)),
+                ('total_departments', models.IntegerField(default=0)),
+                ('total_salaries', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('leave_total', models.IntegerField(default=0)),
+                ('leave_pending', models.IntegerField(default=0)),
+                ('leave_approved', models.IntegerField(default=0)),
+                ('leave_rejected', models.IntegerField(default=0)),
+                ('leave_recent', models.IntegerField(default=0)),
+                ('resource_total', models.IntegerField(default=0)),
+                ('resource_allocated', models.IntegerField(default=0)),
+                ('resource_returned', models.IntegerField(default=0)),
+                ('training_budgets', models.IntegerField(default=0)),
+                ('training_budget_amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('training_remaining_budget', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('training_requests', models.IntegerField(default=0)),
+                ('training_pending_requests', models.IntegerField(default=0)),
+                ('training_approved_requests', models.IntegerField(default=0)),
+                ('recent_salary_payments', models.IntegerField(default=0)),
+                ('rebuilt_at', models.DateTimeField(null=True)),
+            ],
+            options={
+                'db_table': 'dashboard_counters',
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('root', '0008_dashboardcounters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('headcount', models.IntegerField(null=True)),
+                ('payroll_spend', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('salary_payments', models.IntegerField(default=0)),
+                ('leave_days', models.IntegerField(default=0)),
+                ('resource_allocations', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'dashboard_daily_rollups',
+            },
+        ),
+    ]
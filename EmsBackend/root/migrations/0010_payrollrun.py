@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('root', '0009_dailyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollRun',
+            fields=[
+                ('id', models.AutoField(db_column='RunId', primary_key=True, serialize=False)),
+                ('paymentdate', models.DateField(db_column='PaymentDate')),
+                ('employeeids', models.JSONField(db_column='EmployeeIds', default=list)),
+                ('chunksize', models.IntegerField(db_column='ChunkSize')),
+                ('batchsize', models.IntegerField(db_column='BatchSize')),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Running', 'Running'), ('Completed', 'Completed'), ('Failed', 'Failed')], db_column='Status', default='Pending', max_length=10)),
+                ('processedemployees', models.IntegerField(db_column='ProcessedEmployees', default=0)),
+                ('successcount', models.IntegerField(db_column='SuccessCount', default=0)),
+                ('failedpayments', models.JSONField(db_column='FailedPayments', default=list)),
+                ('totalamount', models.DecimalField(db_column='TotalAmount', decimal_places=2, default=0, max_digits=16)),
+                ('chunktimings', models.JSONField(db_column='ChunkTimings', default=list)),
+                ('error', models.CharField(db_column='Error', max_length=500, null=True)),
+                ('startedat', models.DateTimeField(auto_now_add=True, db_column='StartedAt')),
+                ('finishedat', models.DateTimeField(db_column='FinishedAt', null=True)),
+            ],
+            options={
+                'db_table': 'payrollruns',
+            },
+        ),
+    ]
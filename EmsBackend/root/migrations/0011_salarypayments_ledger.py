@@ -0,0 +1,51 @@
+# salarypayments is not managed by Django, so its keys are changed with SQL here
+
+from django.db import migrations
+
+
+def add_ledger_keys(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT Eid, PaidDate, COUNT(*)
+            FROM salarypayments
+            GROUP BY Eid, PaidDate
+            HAVING COUNT(*) > 1
+        """)
+        duplicates = cursor.fetchall()
+        if duplicates:
+            listed = ', '.join(f"{eid} on {paid_date}" for eid, paid_date, _ in duplicates[:20])
+            raise RuntimeError(
+                f"salarypayments has {len(duplicates)} duplicate (Eid, PaidDate) pairs; "
+                f"resolve them before migrating: {listed}"
+            )
+        cursor.execute("""
+            ALTER TABLE salarypayments
+                ADD COLUMN Id INT NOT NULL AUTO_INCREMENT PRIMARY KEY FIRST,
+                ADD UNIQUE KEY salarypayments_eid_paiddate_uniq (Eid, PaidDate),
+                DROP INDEX Eid
+        """)
+
+
+def remove_ledger_keys(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("""
+            ALTER TABLE salarypayments
+                ADD KEY Eid (Eid),
+                DROP INDEX salarypayments_eid_paiddate_uniq,
+                DROP COLUMN Id
+        """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('root', '0010_payrollrun'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_ledger_keys, remove_ledger_keys),
+    ]
@@ -0,0 +1,28 @@
+# salarypayments is not managed by Django; this index serves keyset pages in (PaidDate, Eid) order
+
+from django.db import migrations
+
+
+def add_paiddate_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("ALTER TABLE salarypayments ADD KEY salarypayments_paiddate_eid_idx (PaidDate, Eid)")
+
+
+def remove_paiddate_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("ALTER TABLE salarypayments DROP INDEX salarypayments_paiddate_eid_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('root', '0011_salarypayments_ledger'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_paiddate_index, remove_paiddate_index),
+    ]
@@ -0,0 +1,38 @@
+# employeedetails is not managed by Django; these indexes serve the filtered, keyset-paged directory
+
+from django.db import migrations
+
+
+def add_directory_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("""
+            ALTER TABLE employeedetails
+                ADD KEY employeedetails_dept_status_eid_idx (Department, Status, Eid),
+                ADD KEY employeedetails_status_eid_idx (Status, Eid),
+                ADD KEY employeedetails_fullname_eid_idx (FullName, Eid)
+        """)
+
+
+def remove_directory_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("""
+            ALTER TABLE employeedetails
+                DROP INDEX employeedetails_dept_status_eid_idx,
+                DROP INDEX employeedetails_status_eid_idx,
+                DROP INDEX employeedetails_fullname_eid_idx
+        """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('root', '0012_salarypayments_paiddate_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_directory_indexes, remove_directory_indexes),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 18:31
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def seed_table_versions(apps, schema_editor):
+    # One row per table up front, so writes only ever UPDATE and GETs always have a Last-Modified
+    TableVersion = apps.get_model('root', 'TableVersion')
+    now = timezone.now()
+    TableVersion.objects.bulk_create(
+        [TableVersion(table=model._meta.db_table, version=0, updated_at=now)
+         for model in apps.get_app_config('root').get_models()],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('root', '0013_employeedetails_directory_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableVersion',
+            fields=[
+                ('table', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'table_versions',
+            },
+        ),
+        migrations.RunPython(seed_table_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,85 @@
+# employeedetails, resourceallocation and the leave tables are not managed by Django; this brings the
+# migration state in line with their models and gives the two new tables their table_versions rows
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def seed_table_versions(apps, schema_editor):
+    TableVersion = apps.get_model('root', 'TableVersion')
+    now = timezone.now()
+    TableVersion.objects.bulk_create(
+        [TableVersion(table=table, version=0, updated_at=now) for table in ('employeedetails', 'resourceallocation')],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('root', '0014_tableversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeDetails',
+            fields=[
+                ('eid', models.CharField(db_column='Eid', max_length=100, primary_key=True, serialize=False)),
+                ('fullname', models.CharField(db_column='FullName', max_length=255)),
+                ('initname', models.CharField(blank=True, db_column='InitName', max_length=255, null=True)),
+                ('gender', models.CharField(choices=[('Male', 'Male'), ('Female', 'Female'), ('Other', 'Other')], db_column='Gender', max_length=10)),
+                ('dob', models.DateField(blank=True, db_column='DOB', null=True)),
+                ('maritialstatus', models.CharField(choices=[('Single', 'Single'), ('Married', 'Married'), ('Divorced', 'Divorced'), ('Widowed', 'Widowed')], db_column='MaritialStatus', max_length=20)),
+                ('address', models.TextField(blank=True, db_column='Address', null=True)),
+                ('country', models.CharField(db_column='Country', max_length=100)),
+                ('designation', models.CharField(db_column='Designation', max_length=100)),
+                ('employeetype', models.CharField(db_column='EmployeeType', max_length=50)),
+                ('department', models.CharField(db_column='Department', max_length=100)),
+                ('status', models.CharField(choices=[('Active', 'Active'), ('Inactive', 'Inactive'), ('Suspended', 'Suspended'), ('Terminated', 'Terminated')], db_column='Status', default='Active', max_length=20)),
+                ('usertype', models.CharField(db_column='UserType', max_length=50)),
+                ('degree', models.CharField(blank=True, db_column='Degree', max_length=255, null=True)),
+                ('university', models.CharField(blank=True, db_column='University', max_length=255, null=True)),
+                ('educationlevel', models.CharField(blank=True, choices=[('High School', 'High School'), ('Associate Degree', 'Associate Degree'), ('Bachelor', 'Bachelor'), ('Masters', 'Masters'), ('Doctorate', 'Doctorate'), ('Other', 'Other')], db_column='EducationLevel', max_length=50, null=True)),
+                ('startedyear', models.IntegerField(blank=True, db_column='StartedYear', null=True)),
+                ('completedyear', models.IntegerField(blank=True, db_column='CompletedYear', null=True)),
+                ('educationstatus', models.CharField(blank=True, choices=[('Completed', 'Completed'), ('In Progress', 'In Progress'), ('Dropped', 'Dropped')], db_column='EducationStatus', max_length=20, null=True)),
+                ('email', models.EmailField(db_column='Email', max_length=255)),
+                ('emailtype', models.CharField(choices=[('Official', 'Official'), ('Personal', 'Personal')], db_column='EmailType', default='Official', max_length=20)),
+                ('phone', models.CharField(blank=True, db_column='Phone', max_length=20, null=True)),
+                ('phonetype', models.CharField(blank=True, choices=[('Official', 'Official'), ('Personal', 'Personal'), ('Mobile', 'Mobile'), ('Home', 'Home')], db_column='PhoneType', max_length=20, null=True)),
+                ('image', models.CharField(blank=True, db_column='Image', max_length=1500, null=True)),
+            ],
+            options={
+                'db_table': 'employeedetails',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ResourceAllocation',
+            fields=[
+                ('allocationid', models.AutoField(db_column='AllocationID', primary_key=True, serialize=False)),
+                ('eid', models.CharField(db_column='Eid', max_length=10)),
+                ('rid', models.CharField(db_column='Rid', max_length=10, null=True)),
+                ('allocateddate', models.DateField(db_column='AllocatedDate')),
+                ('collecteddate', models.DateField(db_column='CollectedDate', null=True)),
+                ('useddays', models.IntegerField(db_column='UsedDays', null=True)),
+            ],
+            options={
+                'db_table': 'resourceallocation',
+                'managed': False,
+            },
+        ),
+        migrations.AlterModelTable(
+            name='employeeleavebalance',
+            table='leavebalance',
+        ),
+        migrations.AlterModelTable(
+            name='leaveapplications',
+            table='leaveapply',
+        ),
+        migrations.AlterModelTable(
+            name='leavetype',
+            table='leaves',
+        ),
+        migrations.RunPython(seed_table_versions, migrations.RunPython.noop),
+    ]
@@ -145,16 +145,47 @@ class Salary(models.Model):
 
 
 class SalaryPayments(models.Model):
-    # Use OneToOneField instead of ForeignKey with unique=True
-    eid = models.OneToOneField(Employees, on_delete=models.CASCADE, db_column='Eid', primary_key=True)
+    # Payment ledger: many payments per employee, at most one per employee per day
+    id = models.AutoField(db_column='Id', primary_key=True)
+    eid = models.ForeignKey(Employees, on_delete=models.CASCADE, db_column='Eid')
     salary = models.DecimalField(db_column='Salary', max_digits=10, decimal_places=2, null=True)
     paiddate = models.DateField(db_column='PaidDate', null=True)
     
     class Meta:
+        unique_together = ('eid', 'paiddate')
         managed=False
         db_table='salarypayments'
 
 
+class PayrollRun(models.Model):
+    STATUS_CHOICES = [
+        ('Pending', 'Pending'),
+        ('Running', 'Running'),
+        ('Completed', 'Completed'),
+        ('Failed', 'Failed'),
+    ]
+
+    # The employees to pay are frozen when the run starts; processed_employees is the
+    # checkpoint into that list and is committed together with each chunk's payments
+    id = models.AutoField(db_column='RunId', primary_key=True)
+    paymentdate = models.DateField(db_column='PaymentDate')
+    employeeids = models.JSONField(db_column='EmployeeIds', default=list)
+    chunksize = models.IntegerField(db_column='ChunkSize')
+    batchsize = models.IntegerField(db_column='BatchSize')
+    status = models.CharField(db_column='Status', max_length=10, choices=STATUS_CHOICES, default='Pending')
+    processedemployees = models.IntegerField(db_column='ProcessedEmployees', default=0)
+    successcount = models.IntegerField(db_column='SuccessCount', default=0)
+    failedpayments = models.JSONField(db_column='FailedPayments', default=list)
+    totalamount = models.DecimalField(db_column='TotalAmount', max_digits=16, decimal_places=2, default=0)
+    chunktimings = models.JSONField(db_column='ChunkTimings', default=list)
+    error = models.CharField(db_column='Error', max_length=500, null=True)
+    startedat = models.DateTimeField(db_column='StartedAt', auto_now_add=True)
+    finishedat = models.DateTimeField(db_column='FinishedAt', null=True)
+
+    class Meta:
+        db_table = 'payrollruns'
+
+
 class BankAccountDetails(models.Model):
     eid = models.CharField(db_column='Eid', primary_key=True, max_length=100)
     bankaccountholdername = models.CharField(db_column='BankAccountHolderName', max_length=100, null=True)
@@ -342,4 +373,58 @@ class EmployeeDetails(models.Model):
         db_table = 'employeedetails'
     
     def __str__(self):
-        return f"{self.eid} - {self.fullname}"
\ No newline at end of file
+        return f"{self.eid} - {self.fullname}"
+
+# Dashboard related models
+class DashboardCounters(models.Model):
+    # Single-row read model for the dashboard, kept current by the write paths in views
+    SINGLETON_ID = 1
+
+    id = models.PositiveSmallIntegerField(primary_key=True, default=SINGLETON_ID)
+    total_employees = models.IntegerField(default=0)
+    active_employees = models.IntegerField(default=0)
+    total_departments = models.IntegerField(default=0)
+    total_salaries = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    leave_total = models.IntegerField(default=0)
+    leave_pending = models.IntegerField(default=0)
+    leave_approved = models.IntegerField(default=0)
+    leave_rejected = models.IntegerField(default=0)
+    leave_recent = models.IntegerField(default=0)
+    resource_total = models.IntegerField(default=0)
+    resource_allocated = models.IntegerField(default=0)
+    resource_returned = models.IntegerField(default=0)
+    training_budgets = models.IntegerField(default=0)
+    training_budget_amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    training_remaining_budget = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    training_requests = models.IntegerField(default=0)
+    training_pending_requests = models.IntegerField(default=0)
+    training_approved_requests = models.IntegerField(default=0)
+    recent_salary_payments = models.IntegerField(default=0)
+    rebuilt_at = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = 'dashboard_counters'
+
+
+class DailyRollup(models.Model):
+    # One row per calendar day, filled by the build_daily_rollups command
+    day = models.DateField(primary_key=True)
+    headcount = models.IntegerField(null=True)
+    payroll_spend = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    salary_payments = models.IntegerField(default=0)
+    leave_days = models.IntegerField(default=0)
+    resource_allocations = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'dashboard_daily_rollups'
+
+
+class TableVersion(models.Model):
+    # Write counter per table, bumped by the write paths in views; lets GETs answer
+    # conditional requests and process caches notice changes without reading the table
+    table = models.CharField(max_length=64, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'table_versions'
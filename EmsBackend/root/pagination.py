@@ -0,0 +1,92 @@
+import base64
+import json
+from datetime import date
+
+from django.db.models import Q
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def wants_pagination(request):
+    """
+    List endpoints stay plain arrays for existing clients unless a page is asked for
+    """
+    return 'cursor' in request.query_params or 'limit' in request.query_params
+
+
+def page_size(request):
+    limit = request.query_params.get('limit')
+    if not limit:
+        return DEFAULT_PAGE_SIZE
+    limit = int(limit)
+    if limit < 1:
+        raise ValueError('limit must be a positive integer')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def encode_cursor(ordering, values):
+    payload = json.dumps({'o': ordering, 'k': [v.isoformat() if isinstance(v, date) else v for v in values]})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return payload['o'], payload['k']
+    except (ValueError, KeyError, TypeError):
+        raise ValueError('Invalid cursor')
+
+
+def _after(fields, values):
+    """
+    Q for rows strictly after `values` in the order given by `fields` ('-' for descending):
+    (a, b) > (x, y)  ==  a > x OR (a = x AND b > y)
+    """
+    condition = Q()
+    for i, field in enumerate(fields):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        step = Q(**{f'{name}__{lookup}': values[i]})
+        for previous, value in zip(fields[:i], values[:i]):
+            step &= Q(**{previous.lstrip('-'): value})
+        condition |= step
+    return condition
+
+
+def _key_values(row, model, fields):
+    names = [field.lstrip('-') for field in fields]
+    if isinstance(row, dict):
+        return [row[name] for name in names]
+    return [getattr(row, model._meta.get_field(name).attname) for name in names]
+
+
+def paginate_keyset(request, queryset, orderings, default_ordering):
+    """
+    One keyset page of `queryset`. `orderings` maps an ?ordering= name to the unique
+    tuple of fields it sorts by, so each page is an index seek past the previous
+    page's last row instead of an OFFSET scan. Returns (rows, next cursor or None).
+    Raises ValueError for a bad limit, ordering or cursor.
+    """
+    ordering = request.query_params.get('ordering', default_ordering)
+    if ordering not in orderings:
+        raise ValueError(f"ordering must be one of: {', '.join(orderings)}")
+    fields = orderings[ordering]
+    limit = page_size(request)
+
+    queryset = queryset.order_by(*fields)
+    cursor = request.query_params.get('cursor')
+    if cursor:
+        cursor_ordering, values = decode_cursor(cursor)
+        if cursor_ordering != ordering or len(values) != len(fields):
+            raise ValueError('Cursor does not match the requested ordering')
+        queryset = queryset.filter(_after(fields, values))
+
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(ordering, _key_values(rows[-1], queryset.model, fields))
+    return rows, next_cursor
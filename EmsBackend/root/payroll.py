@@ -0,0 +1,63 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db.models import Case, When, Q, F, Value, DecimalField
+from django.db.models.functions import Coalesce, Round
+
+
+# Statutory contributions as a share of basic salary
+CONTRIBUTION_RATES = {
+    'epf_employee': Decimal('0.08'),
+    'epf_employer': Decimal('0.12'),
+    'etf_employer': Decimal('0.03'),
+}
+
+CENT = Decimal('0.01')
+
+
+def calculate_contribution(basic_salary, field):
+    """
+    One contribution for one basic salary, rounded half-up to cents like the database ROUND()
+    """
+    basic_salary = Decimal(str(basic_salary)) if basic_salary else Decimal('0')
+    return (basic_salary * CONTRIBUTION_RATES[field]).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def calculate_contributions(basic_salaries):
+    """
+    Every contribution for many basic salaries at once, as a list of dicts in input order
+    """
+    return [
+        {field: calculate_contribution(basic_salary, field) for field in CONTRIBUTION_RATES}
+        for basic_salary in basic_salaries
+    ]
+
+
+def fill_missing_contributions(data, basic_salary):
+    """
+    Fill contribution values the client left out of a salary payload, in place
+    """
+    for field in CONTRIBUTION_RATES:
+        if field not in data or not data[field]:
+            data[field] = str(calculate_contribution(basic_salary, field))
+    return data
+
+
+def with_contributions(queryset):
+    """
+    Annotate <field>_calc with each stored contribution, or the database-computed one
+    where it is missing or zero, so listings do no per-row arithmetic in Python
+    """
+    output_field = DecimalField(max_digits=10, decimal_places=2)
+    annotations = {}
+    for field, rate in CONTRIBUTION_RATES.items():
+        computed = Round(
+            Coalesce(F('basicsalary'), Value(Decimal('0'))) * Value(rate, output_field=output_field),
+            2,
+            output_field=output_field,
+        )
+        annotations[f'{field}_calc'] = Case(
+            When(Q(**{f'{field}__isnull': True}) | Q(**{field: 0}), then=computed),
+            default=F(field),
+            output_field=output_field,
+        )
+    return queryset.annotate(**annotations)
@@ -0,0 +1,86 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .models import Departments, EmployeeTypes, LeaveType, UserTypes
+from .versioning import bump_table_versions, table_versions
+
+
+# How long a worker trusts its copy before re-reading the table version (seconds); override
+# with REFERENCE_CACHE_CHECK_INTERVAL in settings
+REFERENCE_CACHE_CHECK_INTERVAL = getattr(settings, 'REFERENCE_CACHE_CHECK_INTERVAL', 1.0)
+
+
+class ReferenceCache:
+    """
+    Process-local copy of a small lookup table, keyed by primary key. It is loaded on first
+    use and reloaded when the table's version in table_versions moves, so a write from any
+    worker reaches the others within REFERENCE_CACHE_CHECK_INTERVAL. ORM writes bump that
+    version and, in this process, drop the copy at once. The rows are shared, so don't modify them.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._lock = threading.Lock()
+        self._rows = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def rows(self):
+        """
+        {pk: instance}, in primary key order
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._rows is not None and now - self._checked_at < REFERENCE_CACHE_CHECK_INTERVAL:
+                return self._rows
+            # Version first: a write landing in between only makes the next check reload again
+            (version, _), = table_versions(self.model).values()
+            if self._rows is None or version != self._version:
+                self._rows = {row.pk: row for row in self.model.objects.order_by('pk')}
+                self._version = version
+            self._checked_at = now
+            return self._rows
+
+    def get(self, pk, default=None):
+        # Users.urid is an integer column while UserTypes.urid is text, so normalise the key
+        return self.rows().get(self.model._meta.pk.to_python(pk), default)
+
+    def all(self):
+        return list(self.rows().values())
+
+    def forget(self):
+        with self._lock:
+            self._rows = None
+
+
+user_types = ReferenceCache(UserTypes)
+employee_types = ReferenceCache(EmployeeTypes)
+departments = ReferenceCache(Departments)
+leave_types = ReferenceCache(LeaveType)
+
+REFERENCE_CACHES = {cache.model: cache for cache in (user_types, employee_types, departments, leave_types)}
+
+
+def clear_reference_caches():
+    for cache in REFERENCE_CACHES.values():
+        cache.forget()
+
+
+def _forget_on_write(sender, **kwargs):
+    cache = REFERENCE_CACHES[sender]
+    # Every ORM write bumps the version, whether it comes from a view, the admin or the shell,
+    # so the other workers and the ETags see it too
+    bump_table_versions(sender)
+    # Now, for reads later in the same transaction, and again once it commits, in case
+    # another thread reloaded the old rows meanwhile
+    cache.forget()
+    transaction.on_commit(cache.forget)
+
+
+for model in REFERENCE_CACHES:
+    post_save.connect(_forget_on_write, sender=model, dispatch_uid=f'reference_cache_{model._meta.db_table}')
+    post_delete.connect(_forget_on_write, sender=model, dispatch_uid=f'reference_cache_{model._meta.db_table}')
@@ -0,0 +1,12 @@
+from django.db.models import OuterRef, Subquery
+
+from .models import Employees
+
+
+def with_employee_names(queryset):
+    """
+    Annotate employee_name on resource allocations from employees in the same query,
+    None where the Eid has no employee
+    """
+    fullname = Employees.objects.filter(eid=OuterRef('eid')).values('fullname')[:1]
+    return queryset.annotate(employee_name=Subquery(fullname))
@@ -2,63 +2,115 @@ from rest_framework import serializers
 from .models import (Departments, EmployeeTypes, UserTypes, Employees, EmployeeEducation, EmployeeEmails, EmployeePhones, 
                    Users, Salary, SalaryPayments, BankAccountDetails, TrainingBudget, TrainingRequest,
                    LeaveType, EmployeeLeaveBalance, LeaveApplications, ResourceAllocation, EmployeeDetails)
-
-class DepartmentsSerializer(serializers.ModelSerializer):
+from .payroll import CONTRIBUTION_RATES, calculate_contribution
+
+
+def requested_fields(request):
+    """
+    Field names asked for with ?fields=eid,fullname, or None for every field
+    """
+    fields = [name.strip() for name in request.query_params.get('fields', '').split(',') if name.strip()]
+    return fields or None
+
+
+def select_fields(data, fields):
+    """
+    Trim a hand-built dict, or list of dicts, to a sparse fieldset
+    """
+    if fields is None:
+        return data
+    if isinstance(data, list):
+        return [select_fields(item, fields) for item in data]
+    return {key: value for key, value in data.items() if key in fields}
+
+
+class SparseFieldsMixin:
+    """
+    Takes fields=[...] to serialize only those fields; unknown names are ignored
+    """
+    # Model fields a serializer field is built from, where that is not just its own name
+    sparse_field_sources = {}
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sparse_fields = set(fields) if fields is not None else None
+        if self.sparse_fields is not None:
+            for name in list(self.fields):
+                if name not in self.sparse_fields:
+                    self.fields.pop(name)
+
+    @classmethod
+    def narrow_queryset(cls, queryset, fields):
+        """
+        Load only the columns a sparse fieldset reads
+        """
+        if fields is None:
+            return queryset
+        model = cls.Meta.model
+        concrete = {field.name for field in model._meta.concrete_fields}
+        needed = {model._meta.pk.name}
+        for name in fields:
+            needed.update(cls.sparse_field_sources.get(name, [name]))
+        return queryset.only(*(needed & concrete))
+
+class DepartmentsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Departments
         fields = ['dno', 'dname', 'noofemp', 'dlocation']
         read_only_fields = ['dno']
 
-class EmployeeTypesSerializer(serializers.ModelSerializer):
+class EmployeeTypesSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = EmployeeTypes
         fields = ['etid', 'employeetype']
         read_only_fields = ['etid']
 
 
-class UserTypesSerializer(serializers.ModelSerializer):
+class UserTypesSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = UserTypes
         fields = ['urid', 'usertype']
         read_only_fields = ['urid']
 
 
-class EmployeesSerializer(serializers.ModelSerializer):
+class EmployeesSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Employees
         fields = ['eid', 'fullname', 'initname', 'dob', 'gender', 'country', 'address', 'maritialstatus', 'image', 'etid', 'dno', 'designation', 'urid', 'status']
         read_only_fields = ['eid']
 
 
-class EmployeeEducationSerializer(serializers.ModelSerializer):
+class EmployeeEducationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = EmployeeEducation
         fields = ['id', 'eid', 'degree', 'educationlevel', 'university', 'startedyear', 'status', 'completedyear']
         read_only_fields = ['id']
 
 
-class EmployeeEmailsSerializer(serializers.ModelSerializer):
+class EmployeeEmailsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = EmployeeEmails
         fields = ['eid', 'emailtype', 'email']
         read_only_fields = ['email']
 
 
-class EmployeePhonesSerializer(serializers.ModelSerializer):
+class EmployeePhonesSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = EmployeePhones
         fields = ['eid', 'phonetype', 'phoneno']
         read_only_fields = ['phoneno']
 
 
-class UsersSerializer(serializers.ModelSerializer):
+class UsersSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Users
         fields = ['eid', 'email', 'password', 'urid']
         read_only_fields = ['eid']
 
 
-class SalarySerializer(serializers.ModelSerializer):
+class SalarySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    sparse_field_sources = {field: [field, 'basicsalary'] for field in CONTRIBUTION_RATES}
+
     class Meta:
         model = Salary
         fields = ['eid', 'basicsalary', 'internetchages', 'allowances', 'deductions', 'epf_employee', 'epf_employer', 'etf_employer', 'netsalary']
@@ -67,47 +119,34 @@ class SalarySerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         representation = super().to_representation(instance)
         
-        # Calculate EPF and ETF values based on basic salary if they're missing
-        try:
-            basic_salary = float(instance.basicsalary) if instance.basicsalary else 0
-            
-            # Set EPF employee value (8% of basic salary)
-            if representation['epf_employee'] is None or representation['epf_employee'] == '0.00':
-                epf_employee = basic_salary * 0.08
-                representation['epf_employee'] = "{:.2f}".format(epf_employee)
-            
-            # Set EPF employer value (12% of basic salary)
-            if representation['epf_employer'] is None or representation['epf_employer'] == '0.00':
-                epf_employer = basic_salary * 0.12
-                representation['epf_employer'] = "{:.2f}".format(epf_employer)
-            
-            # Set ETF employer value (3% of basic salary)
-            if representation['etf_employer'] is None or representation['etf_employer'] == '0.00':
-                etf_employer = basic_salary * 0.03
-                representation['etf_employer'] = "{:.2f}".format(etf_employer)
-            
-        except Exception as e:
-            # Log any errors but don't break the response
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f"Error calculating EPF/ETF values: {str(e)}")
+        # Fill missing EPF and ETF values, preferring the ones computed by with_contributions()
+        for field in CONTRIBUTION_RATES:
+            if field not in representation:
+                continue
+            if representation[field] is None or representation[field] == '0.00':
+                value = getattr(instance, f'{field}_calc', None)
+                if value is None:
+                    value = calculate_contribution(instance.basicsalary, field)
+                representation[field] = "{:.2f}".format(value)
         
         return representation
 
 
-class SalaryPaymentsSerializer(serializers.ModelSerializer):
+class SalaryPaymentsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = SalaryPayments
         fields = ['eid', 'salary', 'paiddate']
         
+    @classmethod
+    def narrow_queryset(cls, queryset, fields):
+        # Every output key is built from the same four narrow columns, so only the output is trimmed
+        return queryset
+
     def to_representation(self, instance):
         # Create a custom representation that guarantees the format we need
         try:
-            # Get the employee ID as a string
-            if hasattr(instance.eid, 'eid'):
-                employee_id = instance.eid.eid
-            else:
-                employee_id = str(instance.eid)
+            # Get the employee ID as a string without loading the employee
+            employee_id = str(instance.eid_id)
                 
             # Format the salary with 2 decimal places
             if instance.salary is not None:
@@ -129,12 +168,12 @@ class SalaryPaymentsSerializer(serializers.ModelSerializer):
                 composite_id = f"{employee_id}_unknown"
                 
             # Return the properly formatted data
-            return {
+            return select_fields({
                 'id': composite_id,
                 'eid': employee_id,
                 'salary': salary_formatted,
                 'paiddate': date_str
-            }
+            }, self.sparse_fields)
         except Exception as e:
             # Log the error
             import logging
@@ -150,21 +189,22 @@ class SalaryPaymentsSerializer(serializers.ModelSerializer):
             }
 
 
-class BankAccountDetailsSerializer(serializers.ModelSerializer):
+class BankAccountDetailsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = BankAccountDetails
         fields = ['eid', 'bankaccountholdername', 'bankaccno', 'bankname', 'bankbranchname']
 
 
-class TrainingBudgetSerializer(serializers.ModelSerializer):
+class TrainingBudgetSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = TrainingBudget
         fields = ['eid', 'trainingbudgetrate', 'trainingbudgetamount', 'remainingamount']
 
 
-class TrainingRequestSerializer(serializers.ModelSerializer):
+class TrainingRequestSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     # Add a virtual ID field for frontend compatibility
     id = serializers.SerializerMethodField()
+    sparse_field_sources = {'id': ['eid']}
     
     class Meta:
         model = TrainingRequest
@@ -179,7 +219,7 @@ class TrainingRequestSerializer(serializers.ModelSerializer):
         representation = super().to_representation(instance)
         
         # Format applied date if it exists
-        if representation['applieddate'] and representation['applieddate'] != 'null':
+        if representation.get('applieddate') and representation['applieddate'] != 'null':
             try:
                 from datetime import datetime
                 date_obj = datetime.strptime(representation['applieddate'], '%Y-%m-%d')
@@ -189,7 +229,7 @@ class TrainingRequestSerializer(serializers.ModelSerializer):
                 pass
         
         # Format granted date if it exists
-        if representation['granteddate'] and representation['granteddate'] != 'null':
+        if representation.get('granteddate') and representation['granteddate'] != 'null':
             try:
                 from datetime import datetime
                 date_obj = datetime.strptime(representation['granteddate'], '%Y-%m-%d')
@@ -202,21 +242,21 @@ class TrainingRequestSerializer(serializers.ModelSerializer):
 
 
 # Leave related serializers
-class LeaveTypeSerializer(serializers.ModelSerializer):
+class LeaveTypeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = LeaveType
         fields = ['lid', 'leavetype']
         read_only_fields = ['lid']
 
 
-class EmployeeLeaveBalanceSerializer(serializers.ModelSerializer):
+class EmployeeLeaveBalanceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = EmployeeLeaveBalance
         fields = ['eid', 'totalannualleaves', 'totalcasualleaves', 'annualleavebalance', 'casualleavebalance']
         read_only_fields = ['eid']
 
 
-class LeaveApplicationsSerializer(serializers.ModelSerializer):
+class LeaveApplicationsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = LeaveApplications
         fields = ['lid', 'eid', 'fromdate', 'todate', 'noofdays', 'description', 'status', 'priority']
@@ -225,7 +265,7 @@ class LeaveApplicationsSerializer(serializers.ModelSerializer):
         representation = super().to_representation(instance)
         
         # Format dates
-        if representation['fromdate']:
+        if representation.get('fromdate'):
             try:
                 from datetime import datetime
                 date_obj = datetime.strptime(representation['fromdate'], '%Y-%m-%d')
@@ -233,7 +273,7 @@ class LeaveApplicationsSerializer(serializers.ModelSerializer):
             except Exception:
                 pass
         
-        if representation['todate']:
+        if representation.get('todate'):
             try:
                 from datetime import datetime
                 date_obj = datetime.strptime(representation['todate'], '%Y-%m-%d')
@@ -246,8 +286,9 @@ class LeaveApplicationsSerializer(serializers.ModelSerializer):
         return representation
 
 
-class ResourceAllocationSerializer(serializers.ModelSerializer):
+class ResourceAllocationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     employee_name = serializers.SerializerMethodField()
+    sparse_field_sources = {'employee_name': ['eid']}
     
     class Meta:
         model = ResourceAllocation
@@ -255,6 +296,9 @@ class ResourceAllocationSerializer(serializers.ModelSerializer):
         read_only_fields = ['allocationid', 'useddays']
     
     def get_employee_name(self, obj):
+        # Listings annotate the name for every row at once (resources.with_employee_names)
+        if hasattr(obj, 'employee_name'):
+            return obj.employee_name
         try:
             employee = Employees.objects.get(eid=obj.eid)
             return employee.fullname
@@ -262,7 +306,7 @@ class ResourceAllocationSerializer(serializers.ModelSerializer):
             return None
 
 
-class EmployeeDetailsSerializer(serializers.ModelSerializer):
+class EmployeeDetailsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = EmployeeDetails
         fields = [
@@ -0,0 +1,85 @@
+from django.db import connection
+from django.http import StreamingHttpResponse
+from rest_framework.settings import api_settings
+
+from .encoders import row_encoder
+from .exports import STREAM_CHUNK_SIZE, stream_rows
+from .renderers import ORJSONRenderer, NDJSONRenderer
+
+
+# Renderers for list views that can stream; NDJSONRenderer makes Accept: application/x-ndjson acceptable
+STREAMING_RENDERER_CLASSES = list(api_settings.DEFAULT_RENDERER_CLASSES) + [NDJSONRenderer]
+
+# Bytes gathered before handing a piece of the body to the server
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+def wants_stream(request):
+    """
+    'ndjson' for Accept: application/x-ndjson, 'json' for ?stream=1, otherwise None
+    """
+    if request.accepted_renderer.format == NDJSONRenderer.format:
+        return 'ndjson'
+    if request.query_params.get('stream') in ('1', 'true'):
+        return 'json'
+    return None
+
+
+def serialized_rows(serializer_class, queryset, fields=None, fast=True, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield one serialized dict per row without holding the queryset in memory.
+    With fast=True rows go through the values_list() encoders; on MySQL they are read with a
+    server-side cursor, because mysqlclient buffers a whole .iterator() result set.
+    """
+    if not fast:
+        serializer = serializer_class(fields=fields)
+        for instance in queryset.iterator(chunk_size=chunk_size):
+            yield serializer.to_representation(instance)
+        return
+
+    columns, encode = row_encoder(serializer_class, fields)
+    for row in value_rows(queryset, columns, chunk_size):
+        yield encode(row)
+
+
+def value_rows(queryset, columns, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Iterate over queryset.values_list(*columns) tuples, with a server-side cursor on MySQL
+    """
+    rows = queryset.values_list(*columns)
+    if connection.vendor == 'mysql':
+        sql, params = rows.query.sql_with_params()
+        return stream_rows(sql, params, chunk_size)
+    return rows.iterator(chunk_size=chunk_size)
+
+
+def _encoded(rows, mode):
+    render = ORJSONRenderer().render
+    buffer = [b'['] if mode == 'json' else []
+    size = 0
+    separator = b''
+    for row in rows:
+        if mode == 'json':
+            chunk = separator + render(row)
+            separator = b','
+        else:
+            chunk = render(row) + b'\n'
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= STREAM_BUFFER_SIZE:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if mode == 'json':
+        buffer.append(b']')
+    if buffer:
+        yield b''.join(buffer)
+
+
+def stream_response(serializer_class, queryset, mode, fields=None, fast=True):
+    """
+    A streamed JSON array (mode 'json') or NDJSON body (mode 'ndjson') of the serialized queryset
+    """
+    content_type = NDJSONRenderer.media_type if mode == 'ndjson' else 'application/json'
+    return StreamingHttpResponse(_encoded(serialized_rows(serializer_class, queryset, fields, fast), mode),
+                                 content_type=content_type)
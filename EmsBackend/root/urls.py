@@ -3,13 +3,20 @@ from . import views
 
 urlpatterns = [
     path("login/", views.user_login, name="user_login"),
+    path("batch/", views.batch_requests, name="batch_requests"),
     path("dashboard/statistics/", views.dashboard_statistics, name="dashboard_statistics"),
+    path("dashboard/trends/", views.dashboard_trends, name="dashboard_trends"),
     path("departments/", views.departments, name="departments"),
     path("departments/<int:dno>/", views.department_details, name="department_details"),
     
     # Employee Details Management
     path("employee_details/", views.employee_details_list, name="employee_details_list"),
+    path("employee_details/import/", views.employee_details_import, name="employee_details_import"),
+    path("employee_details/import/<uuid:report_id>/", views.employee_details_import_report,
+         name="employee_details_import_report"),
+    path("employee_details/bulk/", views.employee_details_bulk, name="employee_details_bulk"),
     path("employee_details/<str:eid>/", views.employee_details_detail, name="employee_details_detail"),
+    path("employees/<str:eid>/overview/", views.employee_overview, name="employee_overview"),
     
     # Legacy employee URLs (kept for compatibility)
     path("employees/", views.employees, name="employees"),
@@ -23,13 +30,18 @@ urlpatterns = [
     path("employees_user/", views.employees_user, name="employees_user"),
     path("employees_user/<int:eid>/<str:email>/", views.employees_user_details, name="employees_user_details"),
     path("salary/", views.employee_salary, name="employee_salary"),
+    path("salary/bulk/", views.salary_bulk, name="salary_bulk"),
     path("salary/<int:eid>/", views.employee_salary_details, name="employee_salary_details"),
     path("salary_payments/", views.salary_payments, name="salary_payments"),
+    path("salary_payments/export/bank-file/", views.salary_payments_bank_file, name="salary_payments_bank_file"),
     path("salary_payments/<int:eid>/", views.salary_payment_details, name="salary_payment_details"),
     path("salary_payments/<int:eid>/<str:date>/", views.salary_payment_details, name="salary_payment_details_with_date"),
     path("employee_payments/<int:eid>/", views.employee_payments, name="employee_payments"),
     path("mass_payment/", views.mass_salary_payment, name="mass_salary_payment"),
+    path("mass_payment/preview/", views.mass_payment_preview, name="mass_payment_preview"),
+    path("mass_payment/<int:run_id>/", views.payroll_run_details, name="payroll_run_details"),
     path("bank_accounts/", views.bank_account_details, name="bank_account_details"),
+    path("bank_accounts/bulk/", views.bank_accounts_bulk, name="bank_accounts_bulk"),
     path("bank_accounts/<int:eid>/", views.bank_account_detail, name="bank_account_detail"),
     
     # Training budget URLs
@@ -44,6 +56,7 @@ urlpatterns = [
     path("leave_types/", views.leave_types, name="leave_types"),
     path("leave_types/<str:lid>/", views.leave_type_details, name="leave_type_details"),
     path("employee_leave_balances/", views.employee_leave_balances, name="employee_leave_balances"),
+    path("employee_leave_balances/bulk/", views.employee_leave_balances_bulk, name="employee_leave_balances_bulk"),
     path("employee_leave_balances/<str:eid>/", views.employee_leave_balance_details, name="employee_leave_balance_details"),
     path("leave_applications/", views.leave_applications, name="leave_applications"),
     path("leave_applications/<str:app_id>/", views.leave_application_details, name="leave_application_details"),
@@ -56,6 +69,7 @@ urlpatterns = [
     
     # Resource allocation URLs
     path("resource_allocations/", views.resource_allocations, name="resource_allocations"),
+    path("resource_allocations/bulk/", views.resource_allocations_bulk, name="resource_allocations_bulk"),
     path("resource_allocations/<int:allocation_id>/", views.resource_allocation_details, name="resource_allocation_details"),
     path("employee_resource_allocations/<str:eid>/", views.employee_resource_allocations, name="employee_resource_allocations"),
 ]
\ No newline at end of file
@@ -0,0 +1,61 @@
+import hashlib
+
+from django.db.models import F
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .models import TableVersion
+
+
+def _table(model):
+    return model if isinstance(model, str) else model._meta.db_table
+
+
+def bump_table_versions(*models):
+    """
+    Record a write to the tables behind models (or table names). Call it from every write
+    path, inside the write's transaction where there is one, so the bump commits with it.
+    """
+    tables = sorted({_table(model) for model in models})
+    now = timezone.now()
+    updated = TableVersion.objects.filter(table__in=tables).update(version=F('version') + 1, updated_at=now)
+    if updated < len(tables):
+        TableVersion.objects.bulk_create(
+            [TableVersion(table=table, version=1, updated_at=now) for table in tables], ignore_conflicts=True)
+
+
+def table_versions(*models):
+    """
+    {table: (version, updated_at)} in one query; tables never written have version 0
+    """
+    tables = [_table(model) for model in models]
+    found = {row.table: (row.version, row.updated_at) for row in TableVersion.objects.filter(table__in=tables)}
+    return {table: found.get(table, (0, None)) for table in tables}
+
+
+def conditional_on_tables(*models):
+    """
+    View decorator adding a strong ETag and Last-Modified to GETs, derived from the table
+    versions, the full URL and the Accept header. A matching If-None-Match or
+    If-Modified-Since is answered with 304 before the view reads the tables themselves.
+    Writes made outside the views do not bump versions.
+    """
+    def versions(request):
+        # condition() asks for the ETag and Last-Modified separately; read the versions once
+        if not hasattr(request, '_table_versions'):
+            request._table_versions = table_versions(*models)
+        return request._table_versions
+
+    def etag(request, *args, **kwargs):
+        key = '|'.join([
+            ','.join(f'{table}:{version}' for table, (version, _) in sorted(versions(request).items())),
+            request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+        ])
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        stamps = [updated_at for _, updated_at in versions(request).values() if updated_at is not None]
+        return max(stamps) if stamps else None
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
@@ -1,21 +1,53 @@
 from django.shortcuts import render
-from django.db.models import Count, Sum, Q
-from .models import (Departments, EmployeeEducation, EmployeeEmails, EmployeePhones, 
+from django.http import FileResponse, StreamingHttpResponse
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.db import transaction
+from django.db.models import QuerySet, CharField, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce
+from .models import (Departments, Employees, EmployeeEducation, EmployeeEmails, EmployeePhones, 
                    Users, Salary, SalaryPayments, BankAccountDetails, TrainingBudget, TrainingRequest, UserTypes,
-                   LeaveType, EmployeeLeaveBalance, LeaveApplications, ResourceAllocation, EmployeeDetails)
+                   LeaveType, EmployeeLeaveBalance, LeaveApplications, ResourceAllocation, EmployeeDetails, PayrollRun)
 from .serializers import (DepartmentsSerializer, EmployeeEducationSerializer, 
                         EmployeeEmailsSerializer, EmployeePhonesSerializer, UsersSerializer,
                         SalarySerializer, SalaryPaymentsSerializer, BankAccountDetailsSerializer,
                         TrainingBudgetSerializer, TrainingRequestSerializer,
                         LeaveTypeSerializer, EmployeeLeaveBalanceSerializer, LeaveApplicationsSerializer,
-                        ResourceAllocationSerializer, EmployeeDetailsSerializer)
+                        ResourceAllocationSerializer, EmployeeDetailsSerializer, requested_fields, select_fields)
 from rest_framework.response import Response
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, renderer_classes
 from rest_framework import status
+from .columnar import COLUMNAR_RENDERER_CLASSES, EXPORT_RENDERER_CLASSES, columnar_format, columnar_response
+from .encoders import encode_rows
+from .batch import validate_batch, run_batch
+from .bulk import (bulk_response, EMPLOYEE_DETAILS_BULK, LEAVE_BALANCES_BULK, BANK_ACCOUNTS_BULK, SALARIES_BULK,
+                   RESOURCE_ALLOCATIONS_BULK)
+from .exports import bank_file_csv, bank_file_fixed_width, payments_without_bank_account
+from .imports import ImportInterrupted, import_employee_details, import_report_path
+from .resources import with_employee_names
+from .pagination import wants_pagination, paginate_keyset
+from .streaming import STREAMING_RENDERER_CLASSES, wants_stream, stream_response
+from .versioning import bump_table_versions, conditional_on_tables
+from . import reference
+from .payroll import CONTRIBUTION_RATES, with_contributions, fill_missing_contributions
+from .mass_payment import (start_payroll_run, process_payroll_run, payroll_run_status, preview_mass_payment,
+                           DEFAULT_BATCH_SIZE, DEFAULT_CHUNK_SIZE)
+from .dashboard import (read_dashboard_statistics, dashboard_contribution, apply_dashboard_delta,
+                        trend_series, TREND_METRICS, TREND_BUCKETS)
 from datetime import date, datetime, timedelta
 
 # Create your views here.
 
+def sparse_serializer(serializer_class, request, instance, many=False):
+    """
+    Serializer for a GET response honouring ?fields=; list querysets also load only those columns
+    """
+    fields = requested_fields(request)
+    if many and isinstance(instance, QuerySet):
+        instance = serializer_class.narrow_queryset(instance, fields)
+    return serializer_class(instance, many=many, fields=fields)
+
+
 # Dashboard Statistics
 @api_view(['GET'])
 def dashboard_statistics(request):
@@ -23,97 +55,7 @@ def dashboard_statistics(request):
     Get dashboard statistics including total employees, departments, salaries, and summaries
     """
     try:
-        # Total employees
-        total_employees = EmployeeDetails.objects.count()
-        
-        # Total departments
-        total_departments = Departments.objects.count()
-        
-        # Total salaries (sum of all net salaries)
-        total_salaries = Salary.objects.aggregate(
-            total=Sum('netsalary')
-        )['total'] or 0
-        
-        # Active employees
-        active_employees = EmployeeDetails.objects.filter(status='Active').count()
-        
-        # Leave summary
-        # Get current year for leave statistics
-        current_year = datetime.now().year
-        current_date = datetime.now().date()
-        
-        # Total leave applications this year
-        total_leave_applications = LeaveApplications.objects.count()
-        pending_leaves = LeaveApplications.objects.filter(status='Pending').count()
-        approved_leaves = LeaveApplications.objects.filter(status='Approved').count()
-        rejected_leaves = LeaveApplications.objects.filter(status='Rejected').count()
-        
-        # Resource summary
-        total_resources = ResourceAllocation.objects.count()
-        allocated_resources = ResourceAllocation.objects.filter(
-            collecteddate__isnull=True
-        ).count()
-        returned_resources = ResourceAllocation.objects.filter(
-            collecteddate__isnull=False
-        ).count()
-        
-        # Training summary
-        total_training_budgets = TrainingBudget.objects.count()
-        total_training_requests = TrainingRequest.objects.count()
-        pending_training_requests = TrainingRequest.objects.filter(status='Pending').count()
-        approved_training_requests = TrainingRequest.objects.filter(status='Approved').count()
-        
-        # Calculate total budget amount
-        total_budget_amount = TrainingBudget.objects.aggregate(
-            total=Sum('trainingbudgetamount')
-        )['total'] or 0
-        
-        # Calculate remaining budget
-        remaining_budget = TrainingBudget.objects.aggregate(
-            total=Sum('remainingamount')
-        )['total'] or 0
-        
-        # Recent activities (last 30 days)
-        thirty_days_ago = current_date - timedelta(days=30)
-        recent_leave_applications = LeaveApplications.objects.filter(
-            fromdate__gte=thirty_days_ago
-        ).count()
-        
-        recent_salary_payments = SalaryPayments.objects.filter(
-            paiddate__gte=thirty_days_ago
-        ).count()
-        
-        dashboard_data = {
-            'total_employees': total_employees,
-            'active_employees': active_employees,
-            'total_departments': total_departments,
-            'total_salaries': float(total_salaries),
-            'leave_summary': {
-                'total_applications': total_leave_applications,
-                'pending': pending_leaves,
-                'approved': approved_leaves,
-                'rejected': rejected_leaves,
-                'recent_applications': recent_leave_applications
-            },
-            'resource_summary': {
-                'total_resources': total_resources,
-                'allocated': allocated_resources,
-                'returned': returned_resources
-            },
-            'training_summary': {
-                'total_budgets': total_training_budgets,
-                'total_requests': total_training_requests,
-                'pending_requests': pending_training_requests,
-                'approved_requests': approved_training_requests,
-                'total_budget_amount': float(total_budget_amount),
-                'remaining_budget': float(remaining_budget)
-            },
-            'recent_activities': {
-                'recent_leave_applications': recent_leave_applications,
-                'recent_salary_payments': recent_salary_payments
-            }
-        }
-        
+        dashboard_data = read_dashboard_statistics()
         return Response(dashboard_data, status=status.HTTP_200_OK)
         
     except Exception as e:
@@ -122,6 +64,45 @@ def dashboard_statistics(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+
+@api_view(['GET'])
+def dashboard_trends(request):
+    """
+    Get a time-bucketed trend series (?metric=&bucket=&from=&to=) from the daily rollups
+    """
+    metric = request.query_params.get('metric')
+    bucket = request.query_params.get('bucket', 'month')
+    if metric not in TREND_METRICS:
+        return Response({'error': f"metric must be one of: {', '.join(TREND_METRICS)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if bucket not in TREND_BUCKETS:
+        return Response({'error': f"bucket must be one of: {', '.join(TREND_BUCKETS)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        to_param = request.query_params.get('to')
+        from_param = request.query_params.get('from')
+        to_date = date.fromisoformat(to_param) if to_param else date.today()
+        from_date = date.fromisoformat(from_param) if from_param else to_date - timedelta(days=365)
+    except ValueError:
+        return Response({'error': 'from and to must be dates in YYYY-MM-DD format'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        series = trend_series(metric, bucket, from_date, to_date)
+        return Response({
+            'metric': metric,
+            'bucket': bucket,
+            'from': from_date.isoformat(),
+            'to': to_date.isoformat(),
+            'series': series
+        }, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response(
+            {'error': f'Failed to fetch dashboard trends: {str(e)}'}, 
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
 # Authentication function
 @api_view(['POST'])
 def user_login(request):
@@ -143,7 +124,10 @@ def user_login(request):
             # Check password (in production, use proper password hashing)
             if user.password == password:
                 # Get user type
-                user_type = UserTypes.objects.get(urid=user.urid)
+                user_type = reference.user_types.get(user.urid)
+                if user_type is None:
+                    return Response({'success': False, 'message': 'User role not found'}, 
+                                    status=status.HTTP_500_INTERNAL_SERVER_ERROR)
                 
                 return Response({
                     'success': True,
@@ -162,26 +146,40 @@ def user_login(request):
         except Users.DoesNotExist:
             return Response({'success': False, 'message': 'User not found'}, 
                             status=status.HTTP_404_NOT_FOUND)
-        except UserTypes.DoesNotExist:
-            return Response({'success': False, 'message': 'User role not found'}, 
-                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         except Exception as e:
             return Response({'success': False, 'message': str(e)}, 
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+
+@api_view(['POST'])
+def batch_requests(request):
+    """
+    Run a list of {method, path, body} sub-requests through the API in one round trip and
+    return [{status, body}] in the same order. Reads run concurrently; writes run one at a time.
+    """
+    try:
+        sub_requests = validate_batch(request.data)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(run_batch(request._request, sub_requests))
+
+
 # Department related functions
 @api_view(['GET', 'POST'])
+@conditional_on_tables(Departments)
 def departments(request):
     if request.method == 'GET':
         # get all departments
-        departments = Departments.objects.all()
-        serializer = DepartmentsSerializer(departments, many=True)
+        departments = reference.departments.all()
+        serializer = sparse_serializer(DepartmentsSerializer, request, departments, many=True)
         return Response(serializer.data)
     elif request.method == 'POST':
         # add a new department
         serializer = DepartmentsSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                serializer.save()
+                apply_dashboard_delta({}, dashboard_contribution(serializer.instance))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -195,7 +193,7 @@ def department_details(request, dno):
     
     if request.method == 'GET':
         # get single department
-        serializer = DepartmentsSerializer(department)
+        serializer = sparse_serializer(DepartmentsSerializer, request, department)
         return Response(serializer.data)  
     if request.method == 'PUT':
         # update a department
@@ -206,26 +204,74 @@ def department_details(request, dno):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     if request.method == 'DELETE':
         # Delete a department
-        department.delete()
+        with transaction.atomic():
+            apply_dashboard_delta(dashboard_contribution(department), {})
+            department.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 # Employee Details related functions
+# Exact-match filters for the employee directory
+EMPLOYEE_DETAILS_FILTERS = ['department', 'status', 'designation', 'employeetype']
+
+# Keyset orderings for the employee directory; Eid breaks ties so each is unique
+EMPLOYEE_DETAILS_ORDERINGS = {
+    'eid': ('eid',),
+    '-eid': ('-eid',),
+    'fullname': ('fullname', 'eid'),
+    '-fullname': ('-fullname', '-eid'),
+}
+
+
 @api_view(['GET', 'POST'])
+@renderer_classes(EXPORT_RENDERER_CLASSES)
+@conditional_on_tables(EmployeeDetails)
 def employee_details_list(request):
     """
     List all employee details or create a new employee detail record
     """
     if request.method == 'GET':
-        # Get all employee details
+        # Filter on the server, e.g. ?department=Finance&status=Active
         employee_details = EmployeeDetails.objects.all()
-        serializer = EmployeeDetailsSerializer(employee_details, many=True)
-        return Response(serializer.data)
+        for field in EMPLOYEE_DETAILS_FILTERS:
+            value = request.query_params.get(field)
+            if value:
+                employee_details = employee_details.filter(**{field: value})
+
+        export_format = columnar_format(request)
+        if export_format:
+            return columnar_response(EmployeeDetailsSerializer, employee_details.order_by('eid'), export_format,
+                                     'employee_details', requested_fields(request))
+
+        if not wants_pagination(request):
+            ordering = request.query_params.get('ordering', 'eid')
+            if ordering not in EMPLOYEE_DETAILS_ORDERINGS:
+                return Response({'error': f"ordering must be one of: {', '.join(EMPLOYEE_DETAILS_ORDERINGS)}"},
+                                status=status.HTTP_400_BAD_REQUEST)
+            employee_details = employee_details.order_by(*EMPLOYEE_DETAILS_ORDERINGS[ordering])
+            # Read-only fast path: rows go straight from tuples to dicts
+            return Response(encode_rows(EmployeeDetailsSerializer, employee_details, requested_fields(request)))
+
+        fields = requested_fields(request)
+        if fields is not None:
+            # Keep every keyset column loaded for building the next cursor
+            employee_details = EmployeeDetailsSerializer.narrow_queryset(employee_details, fields + ['fullname'])
+        try:
+            rows, next_cursor = paginate_keyset(request, employee_details, EMPLOYEE_DETAILS_ORDERINGS, 'eid')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'results': sparse_serializer(EmployeeDetailsSerializer, request, rows, many=True).data,
+            'next': next_cursor
+        })
     elif request.method == 'POST':
         # Create a new employee detail record
         serializer = EmployeeDetailsSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                serializer.save()
+                bump_table_versions(EmployeeDetails)
+                apply_dashboard_delta({}, dashboard_contribution(serializer.instance))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -242,21 +288,128 @@ def employee_details_detail(request, eid):
     
     if request.method == 'GET':
         # Get single employee detail
-        serializer = EmployeeDetailsSerializer(employee_detail)
+        serializer = sparse_serializer(EmployeeDetailsSerializer, request, employee_detail)
         return Response(serializer.data)
     elif request.method == 'PUT':
         # Update employee detail
         serializer = EmployeeDetailsSerializer(employee_detail, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                before = dashboard_contribution(employee_detail)
+                serializer.save()
+                bump_table_versions(EmployeeDetails)
+                apply_dashboard_delta(before, dashboard_contribution(serializer.instance))
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     elif request.method == 'DELETE':
         # Delete employee detail
-        employee_detail.delete()
+        with transaction.atomic():
+            apply_dashboard_delta(dashboard_contribution(employee_detail), {})
+            employee_detail.delete()
+            bump_table_versions(EmployeeDetails)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@api_view(['POST'])
+def employee_details_import(request):
+    """
+    Import employee details from a CSV or XLSX upload (multipart field 'file') whose header
+    row names the fields. Valid rows are inserted and invalid ones skipped; the response
+    counts both and links a CSV report of every error. A file that turns unreadable part-way
+    through is a 400 that also gives the row it stopped at and what was already imported.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'error': "Upload the file in a 'file' field"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        summary = import_employee_details(upload)
+    except ImportInterrupted as e:
+        # Earlier chunks are committed: say how far the import got
+        body = {'error': str(e), 'row': e.row, **_import_summary(request, e.summary)}
+        return Response(body, status=status.HTTP_400_BAD_REQUEST)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(_import_summary(request, summary), status=status.HTTP_200_OK)
+
+
+def _import_summary(request, summary):
+    summary = dict(summary)
+    report_id = summary.pop('report_id')
+    summary['error_report'] = request.build_absolute_uri(
+        reverse('employee_details_import_report', args=[report_id])) if report_id else None
+    return summary
+
+
+@api_view(['GET'])
+def employee_details_import_report(request, report_id):
+    """
+    Download the error report of an employee import
+    """
+    path = import_report_path(report_id)
+    if not default_storage.exists(path):
+        return Response({'error': 'Import report not found'}, status=status.HTTP_404_NOT_FOUND)
+    return FileResponse(default_storage.open(path, 'rb'), as_attachment=True, content_type='text/csv',
+                        filename=f'employee-import-errors-{report_id}.csv')
+
+
+def _first(serializer_class, queryset):
+    instance = queryset.first()
+    return serializer_class(instance).data if instance is not None else None
+
+
+def _training_budget(eid):
+    # training has an integer Eid
+    if not eid.isdigit():
+        return None
+    return _first(TrainingBudgetSerializer, TrainingBudget.objects.filter(eid=eid))
+
+
+def _training_request(eid):
+    # Same shape as /training_requests/<id>/; trainingbudgetallocation has an integer Eid too
+    if not eid.isdigit():
+        return None
+    training_request = TrainingRequest.objects.filter(eid=eid).values(
+        'eid', 'requestedamount', 'reason', 'applieddate', 'status', 'granteddate', 'proofdocumenturl').first()
+    if training_request is None:
+        return None
+    training_request['id'] = f"tr_{training_request['eid']}"
+    for field in ('applieddate', 'granteddate'):
+        if training_request[field]:
+            training_request[field] = training_request[field].isoformat()
+    return training_request
+
+
+# Sections of the employee overview, each the body of the endpoint it replaces and one indexed query
+EMPLOYEE_OVERVIEW_SECTIONS = {
+    'details': lambda eid: _first(EmployeeDetailsSerializer, EmployeeDetails.objects.filter(eid=eid)),
+    'salary': lambda eid: _first(SalarySerializer, Salary.objects.filter(eid=eid)),
+    'leave_balance': lambda eid: _first(EmployeeLeaveBalanceSerializer, EmployeeLeaveBalance.objects.filter(eid=eid)),
+    'leave_applications': lambda eid: encode_rows(LeaveApplicationsSerializer, LeaveApplications.objects.filter(eid=eid)),
+    'resource_allocations': lambda eid: encode_rows(
+        ResourceAllocationSerializer, with_employee_names(ResourceAllocation.objects.filter(eid=eid))),
+    'training_budget': _training_budget,
+    'training_request': _training_request,
+}
+
+
+@api_view(['GET'])
+@conditional_on_tables(EmployeeDetails, Salary, EmployeeLeaveBalance, LeaveApplications, ResourceAllocation,
+                       Employees, TrainingBudget, TrainingRequest)
+def employee_overview(request, eid):
+    """
+    Everything the employee profile and portal pages show, in one response. ?include= takes a
+    comma-separated list of sections (default: all); a missing record is null, a missing list empty
+    """
+    include = request.query_params.get('include')
+    sections = [section for section in include.split(',') if section] if include else list(EMPLOYEE_OVERVIEW_SECTIONS)
+    unknown = [section for section in sections if section not in EMPLOYEE_OVERVIEW_SECTIONS]
+    if unknown:
+        return Response({'error': f"Unknown sections: {', '.join(unknown)}. "
+                                  f"Choose from: {', '.join(EMPLOYEE_OVERVIEW_SECTIONS)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    return Response({section: EMPLOYEE_OVERVIEW_SECTIONS[section](eid) for section in sections})
+
+
 # Legacy Employee related functions - Kept for compatibility
 @api_view(['GET', 'POST'])
 def employees(request):
@@ -285,13 +438,14 @@ def employees_education(request):
         else:
             # get all employees education
             employees_education = EmployeeEducation.objects.all()
-        serializer = EmployeeEducationSerializer(employees_education, many=True)
+        serializer = sparse_serializer(EmployeeEducationSerializer, request, employees_education, many=True)
         return Response(serializer.data)
     elif request.method == 'POST':
         # add a new employee education
         serializer = EmployeeEducationSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
+            bump_table_versions(EmployeeEducation)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)  
     
@@ -305,18 +459,20 @@ def employees_education_details(request, eid, eduid):
     
     if request.method == 'GET':
         # get single employee education
-        serializer = EmployeeEducationSerializer(employee_education)
+        serializer = sparse_serializer(EmployeeEducationSerializer, request, employee_education)
         return Response(serializer.data)  
     if request.method == 'PUT':
         # update a employee education
         serializer = EmployeeEducationSerializer(employee_education, data=request.data)
         if serializer.is_valid():
             serializer.save()
+            bump_table_versions(EmployeeEducation)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     if request.method == 'DELETE':
         # Delete a employee education
         employee_education.delete()
+        bump_table_versions(EmployeeEducation)
         return Response(status=status.HTTP_204_NO_CONTENT)
     
 
@@ -333,13 +489,14 @@ def employees_email(request):
         else:
             # get all employees email
             employees_email = EmployeeEmails.objects.all()
-        serializer = EmployeeEmailsSerializer(employees_email, many=True)
+        serializer = sparse_serializer(EmployeeEmailsSerializer, request, employees_email, many=True)
         return Response(serializer.data)
     elif request.method == 'POST':
         # add a new employee email
         serializer = EmployeeEmailsSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
+            bump_table_versions(EmployeeEmails)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)  
     
@@ -353,18 +510,20 @@ def employees_email_details(request, eid, email):
     
     if request.method == 'GET':
         # get single employee email
-        serializer = EmployeeEmailsSerializer(employee_email)
+        serializer = sparse_serializer(EmployeeEmailsSerializer, request, employee_email)
         return Response(serializer.data)  
     if request.method == 'PUT':
         # update a employee email
         serializer = EmployeeEmailsSerializer(employee_email, data=request.data)
         if serializer.is_valid():
             serializer.save()
+            bump_table_versions(EmployeeEmails)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     if request.method == 'DELETE':
         # Delete a employee email
         employee_email.delete()
+        bump_table_versions(EmployeeEmails)
         return Response(status=status.HTTP_204_NO_CONTENT)
     
 
@@ -379,13 +538,14 @@ def employees_phone(request):
         else:
             # get all employees phone
             employees_phone = EmployeePhones.objects.all()
-        serializer = EmployeePhonesSerializer(employees_phone, many=True)
+        serializer = sparse_serializer(EmployeePhonesSerializer, request, employees_phone, many=True)
         return Response(serializer.data)
     elif request.method == 'POST':
         # add a new employee phone
         serializer = EmployeePhonesSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
+            bump_table_versions(EmployeePhones)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)  
     
@@ -399,18 +559,20 @@ def employees_phone_details(request, eid, phoneno):
     
     if request.method == 'GET':
         # get single employee phone 
-        serializer = EmployeePhonesSerializer(employee_phone)
+        serializer = sparse_serializer(EmployeePhonesSerializer, request, employee_phone)
         return Response(serializer.data)  
     if request.method == 'PUT':
         # update a employee phone 
         serializer = EmployeePhonesSerializer(employee_phone, data=request.data)
         if serializer.is_valid():
             serializer.save()
+            bump_table_versions(EmployeePhones)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     if request.method == 'DELETE':
         # Delete a employee phone
         employee_phone.delete()
+        bump_table_versions(EmployeePhones)
         return Response(status=status.HTTP_204_NO_CONTENT)
     
 
@@ -425,13 +587,14 @@ def employees_user(request):
         else:
             # get all employees phone
             employees_user = Users.objects.all()
-        serializer = UsersSerializer(employees_user, many=True)
+        serializer = sparse_serializer(UsersSerializer, request, employees_user, many=True)
         return Response(serializer.data)
     elif request.method == 'POST':
         # add a new employee phone
         serializer = UsersSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
+            bump_table_versions(Users)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)  
     
@@ -445,49 +608,44 @@ def employees_user_details(request, eid, email):
     
     if request.method == 'GET':
         # get single employee phone
-        serializer = UsersSerializer(employee_user)
+        serializer = sparse_serializer(UsersSerializer, request, employee_user)
         return Response(serializer.data)  
     if request.method == 'PUT':
         # update a employee phone
         serializer = UsersSerializer(employee_user, data=request.data)
         if serializer.is_valid():
             serializer.save()
+            bump_table_versions(Users)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     if request.method == 'DELETE':
         # Delete a employee phone
         employee_user.delete()
+        bump_table_versions(Users)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 # Salary related functions
 @api_view(['GET', 'POST'])
+@renderer_classes(EXPORT_RENDERER_CLASSES)
+@conditional_on_tables(Salary)
 def employee_salary(request):
     if request.method == 'GET':
-        # get all salary records
-        salaries = Salary.objects.all()
-        serializer = SalarySerializer(salaries, many=True)
+        # get all salary records, with missing EPF/ETF values computed by the database
+        salaries = with_contributions(Salary.objects.all())
+        export_format = columnar_format(request)
+        if export_format:
+            return columnar_response(SalarySerializer, salaries, export_format, 'salary', requested_fields(request),
+                                     sources={field: f'{field}_calc' for field in CONTRIBUTION_RATES})
+        serializer = sparse_serializer(SalarySerializer, request, salaries, many=True)
         return Response(serializer.data)
     elif request.method == 'POST':
         # add a new salary record
         data = request.data.copy()
         
-        # Calculate EPF and ETF values if they're not provided
+        # Calculate EPF (8% / 12%) and ETF (3%) values if they're not provided
         try:
-            basic_salary = float(data.get('basicsalary', 0))
-            
-            # Add EPF employee (8% of basic salary) if not present
-            if 'epf_employee' not in data or not data['epf_employee']:
-                data['epf_employee'] = "{:.2f}".format(basic_salary * 0.08)
-                
-            # Add EPF employer (12% of basic salary) if not present
-            if 'epf_employer' not in data or not data['epf_employer']:
-                data['epf_employer'] = "{:.2f}".format(basic_salary * 0.12)
-                
-            # Add ETF employer (3% of basic salary) if not present
-            if 'etf_employer' not in data or not data['etf_employer']:
-                data['etf_employer'] = "{:.2f}".format(basic_salary * 0.03)
-                
+            fill_missing_contributions(data, data.get('basicsalary', 0))
         except Exception as e:
             # Log any errors but proceed with the request
             import logging
@@ -496,7 +654,10 @@ def employee_salary(request):
         
         serializer = SalarySerializer(data=data)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                serializer.save()
+                bump_table_versions(Salary)
+                apply_dashboard_delta({}, dashboard_contribution(serializer.instance))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -510,28 +671,15 @@ def employee_salary_details(request, eid):
     
     if request.method == 'GET':
         # get single salary record
-        serializer = SalarySerializer(salary)
+        serializer = sparse_serializer(SalarySerializer, request, salary)
         return Response(serializer.data)  
     if request.method == 'PUT':
         # update a salary record
         data = request.data.copy()
         
-        # Calculate EPF and ETF values if they're not provided
+        # Calculate EPF (8% / 12%) and ETF (3%) values if they're not provided
         try:
-            basic_salary = float(data.get('basicsalary', salary.basicsalary or 0))
-            
-            # Add EPF employee (8% of basic salary) if not present
-            if 'epf_employee' not in data or not data['epf_employee']:
-                data['epf_employee'] = "{:.2f}".format(basic_salary * 0.08)
-                
-            # Add EPF employer (12% of basic salary) if not present
-            if 'epf_employer' not in data or not data['epf_employer']:
-                data['epf_employer'] = "{:.2f}".format(basic_salary * 0.12)
-                
-            # Add ETF employer (3% of basic salary) if not present
-            if 'etf_employer' not in data or not data['etf_employer']:
-                data['etf_employer'] = "{:.2f}".format(basic_salary * 0.03)
-                
+            fill_missing_contributions(data, data.get('basicsalary', salary.basicsalary or 0))
         except Exception as e:
             # Log any errors but proceed with the request
             import logging
@@ -540,65 +688,76 @@ def employee_salary_details(request, eid):
         
         serializer = SalarySerializer(salary, data=data)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                before = dashboard_contribution(salary)
+                serializer.save()
+                bump_table_versions(Salary)
+                apply_dashboard_delta(before, dashboard_contribution(serializer.instance))
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     if request.method == 'DELETE':
         # Delete a salary record
-        salary.delete()
+        with transaction.atomic():
+            apply_dashboard_delta(dashboard_contribution(salary), {})
+            salary.delete()
+            bump_table_versions(Salary)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+# Keyset orderings for payment history; each is unique thanks to the (Eid, PaidDate) key
+PAYMENT_ORDERINGS = {
+    'eid': ('eid', 'paiddate'),
+    'paiddate': ('paiddate', 'eid'),
+    '-paiddate': ('-paiddate', '-eid'),
+}
+
+
+def payment_history_response(request, payments, default_ordering):
+    """
+    Payment history filtered by ?since=/?until=, as a plain array, an Arrow/Parquet export
+    (?format=arrow|parquet) or, when ?limit= or ?cursor= is given, as one keyset page:
+    {"results": [...], "next": cursor or null}
+    """
+    try:
+        since = request.query_params.get('since')
+        until = request.query_params.get('until')
+        if since:
+            payments = payments.filter(paiddate__gte=date.fromisoformat(since))
+        if until:
+            payments = payments.filter(paiddate__lte=date.fromisoformat(until))
+    except ValueError:
+        return Response({"error": "since and until must be dates in YYYY-MM-DD format"},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    export_format = columnar_format(request)
+    if export_format:
+        return columnar_response(SalaryPaymentsSerializer, payments.order_by(*PAYMENT_ORDERINGS[default_ordering]),
+                                 export_format, 'salary_payments', requested_fields(request))
+
+    if not wants_pagination(request):
+        payments = payments.order_by(*PAYMENT_ORDERINGS[default_ordering])
+        return Response(sparse_serializer(SalaryPaymentsSerializer, request, payments, many=True).data)
+
+    try:
+        # Rows without a paid date have no place in the key order
+        rows, next_cursor = paginate_keyset(
+            request, payments.filter(paiddate__isnull=False), PAYMENT_ORDERINGS, default_ordering
+        )
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        'results': sparse_serializer(SalaryPaymentsSerializer, request, rows, many=True).data,
+        'next': next_cursor
+    })
+
+
 @api_view(['GET', 'POST'])
+@renderer_classes(EXPORT_RENDERER_CLASSES)
 def salary_payments(request):
     if request.method == 'GET':
         try:
-            # Use raw SQL to avoid Django ORM's automatic id field
-            from django.db import connection
-            
-            with connection.cursor() as cursor:
-                cursor.execute("""
-                    SELECT Eid, Salary, PaidDate 
-                    FROM salarypayments
-                    ORDER BY Eid
-                """)
-                
-                # Format the data for the frontend
-                result = []
-                for row in cursor.fetchall():
-                    employee_id = row[0]  # Eid
-                    salary = row[1]       # Salary
-                    paid_date = row[2]    # PaidDate
-                    
-                    # Create an ID for frontend reference
-                    payment_id = f"{employee_id}_unknown"
-                    date_str = ""
-                    
-                    if paid_date:
-                        try:
-                            payment_id = f"{employee_id}_{paid_date.strftime('%Y%m%d')}"
-                            date_str = paid_date.isoformat()
-                        except:
-                            pass
-                    
-                    # Format the salary with 2 decimal places
-                    try:
-                        salary_value = float(salary) if salary else 0
-                        salary_formatted = "{:.2f}".format(salary_value)
-                    except:
-                        salary_formatted = "0.00"
-                    
-                    # Create the payment record
-                    payment_record = {
-                        "id": payment_id,
-                        "eid": employee_id,
-                        "salary": salary_formatted,
-                        "paiddate": date_str
-                    }
-                    
-                    result.append(payment_record)
-            
-            return Response(result)
+            # Read the ledger in (Eid, PaidDate) index order
+            return payment_history_response(request, SalaryPayments.objects.all(), 'eid')
         except Exception as e:
             # Log the error
             import logging
@@ -610,7 +769,10 @@ def salary_payments(request):
             # Add a new salary payment record
             serializer = SalaryPaymentsSerializer(data=request.data)
             if serializer.is_valid():
-                serializer.save()
+                with transaction.atomic():
+                    serializer.save()
+                    bump_table_versions(SalaryPayments)
+                    apply_dashboard_delta({}, dashboard_contribution(serializer.instance))
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
@@ -621,6 +783,43 @@ def salary_payments(request):
             return Response({"error": f"Server error: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+def salary_payments_bank_file(request):
+    """
+    Stream the bank transfer file for a payment date (?date=YYYY-MM-DD&layout=csv|fixed),
+    grouped by bank and branch
+    """
+    try:
+        payment_date = date.fromisoformat(request.query_params.get('date', ''))
+    except ValueError:
+        return Response({"error": "date must be a date in YYYY-MM-DD format"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # 'format' is taken by DRF's content negotiation, hence 'layout'
+    layout = request.query_params.get('layout', 'csv')
+    if layout not in ('csv', 'fixed'):
+        return Response({"error": "layout must be csv or fixed"}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # A file missing some of the day's payments would still look complete to the bank
+    missing = payments_without_bank_account(payment_date)
+    if missing:
+        return Response({
+            "error": "Some employees paid on this date have no bank account",
+            "missing_bank_account": missing
+        }, status=status.HTTP_409_CONFLICT)
+    
+    if layout == 'csv':
+        response = StreamingHttpResponse(bank_file_csv(payment_date), content_type='text/csv')
+        extension = 'csv'
+    elif layout == 'fixed':
+        response = StreamingHttpResponse(bank_file_fixed_width(payment_date), content_type='text/plain')
+        extension = 'txt'
+    
+    response['Content-Disposition'] = (
+        f'attachment; filename="bank-transfers-{payment_date.strftime("%Y%m%d")}.{extension}"'
+    )
+    return response
+
+
 @api_view(['GET', 'PUT', 'DELETE'])
 def salary_payment_details(request, eid, date=None):
     # Log request for debugging
@@ -633,62 +832,39 @@ def salary_payment_details(request, eid, date=None):
         if date is None and request.GET.get('date'):
             date = request.GET.get('date')
             
-        # Check if eid contains the composite key format (eid_date)
-        if "_" in str(eid) and date is None:
-            parts = str(eid).split("_")
-            if len(parts) == 2:
-                # Extract employee ID and date from the composite key
-                emp_id = parts[0]
-                
-                if parts[1] == "unknown":
-                    # Find the first payment for this employee
-                    payment = SalaryPayments.objects.filter(eid=emp_id).order_by('-paiddate').first()
-                    if not payment:
-                        return Response({"error": f"No payment found for employee {emp_id}"}, status=status.HTTP_404_NOT_FOUND)
-                else:
-                    try:
-                        # Try to parse the date from YYYYMMDD format
-                        year = int(parts[1][:4])
-                        month = int(parts[1][4:6])
-                        day = int(parts[1][6:8])
-                        from datetime import date as dt_date
-                        parsed_date = dt_date(year, month, day)
-                        
-                        # Get the payment record
-                        payment = SalaryPayments.objects.get(eid=emp_id, paiddate=parsed_date)
-                    except (ValueError, IndexError):
-                        return Response({"error": f"Invalid payment ID format: {eid}"}, status=status.HTTP_400_BAD_REQUEST)
-                    except SalaryPayments.DoesNotExist:
-                        return Response({"error": f"No payment found with ID {eid}"}, status=status.HTTP_404_NOT_FOUND)
-            else:
-                return Response({"error": f"Invalid payment ID format: {eid}"}, status=status.HTTP_400_BAD_REQUEST)
+        if date:
+            # Seek on the unique (Eid, PaidDate) index
+            payment = SalaryPayments.objects.get(eid=eid, paiddate=date)
         else:
-            if date:
-                # Query by both employee ID and date
-                payment = SalaryPayments.objects.get(eid=eid, paiddate=date)
-            else:
-                # Just get the first payment for this employee
-                payment = SalaryPayments.objects.filter(eid=eid).first()
-                if not payment:
-                    return Response({"error": f"No payment found for employee {eid}"}, status=status.HTTP_404_NOT_FOUND)
+            # Just get the latest payment for this employee
+            payment = SalaryPayments.objects.filter(eid=eid).order_by('-paiddate').first()
+            if not payment:
+                return Response({"error": f"No payment found for employee {eid}"}, status=status.HTTP_404_NOT_FOUND)
                 
         # Process the request based on HTTP method
         if request.method == 'GET':
             # Get single salary payment record
-            serializer = SalaryPaymentsSerializer(payment)
+            serializer = sparse_serializer(SalaryPaymentsSerializer, request, payment)
             return Response(serializer.data)  
             
         elif request.method == 'PUT':
             # Update a salary payment record
             serializer = SalaryPaymentsSerializer(payment, data=request.data)
             if serializer.is_valid():
-                serializer.save()
+                with transaction.atomic():
+                    before = dashboard_contribution(payment)
+                    serializer.save()
+                    bump_table_versions(SalaryPayments)
+                    apply_dashboard_delta(before, dashboard_contribution(serializer.instance))
                 return Response(serializer.data, status=status.HTTP_200_OK)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             
         elif request.method == 'DELETE':
             # Delete a salary payment record
-            payment.delete()
+            with transaction.atomic():
+                apply_dashboard_delta(dashboard_contribution(payment), {})
+                payment.delete()
+                bump_table_versions(SalaryPayments)
             return Response(status=status.HTTP_204_NO_CONTENT)
             
     except SalaryPayments.DoesNotExist:
@@ -702,77 +878,62 @@ def salary_payment_details(request, eid, date=None):
 def employee_payments(request, eid):
     """Get all salary payments for a specific employee"""
     try:
-        payments = SalaryPayments.objects.filter(eid=eid)
-        serializer = SalaryPaymentsSerializer(payments, many=True)
-        return Response(serializer.data)
+        return payment_history_response(request, SalaryPayments.objects.filter(eid=eid), 'paiddate')
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['POST'])
 def mass_salary_payment(request):
-    """Process salary payments for multiple employees at once"""
+    """
+    Process salary payments for multiple employees at once as a chunked payroll run.
+    Pass the run_id of an unfinished run to resume it from its last checkpoint.
+    """
+    run_id = request.data.get('run_id', None)  # Optional run to resume
     employee_ids = request.data.get('employee_ids', None)  # Optional list of employee IDs
     payment_date_str = request.data.get('payment_date', None)  # Optional payment date
+    batch_size = request.data.get('batch_size', None)  # Optional rows per INSERT
+    chunk_size = request.data.get('chunk_size', None)  # Optional employees per checkpoint
+    run = None
     
     try:
-        # Convert payment date string to date object if provided
-        if payment_date_str:
-            payment_date = date.fromisoformat(payment_date_str)
+        if run_id is not None:
+            try:
+                run = PayrollRun.objects.get(pk=run_id)
+            except (PayrollRun.DoesNotExist, ValueError):
+                return Response({
+                    'success': False,
+                    'message': f"No payroll run found with ID {run_id}"
+                }, status=status.HTTP_404_NOT_FOUND)
         else:
-            payment_date = date.today()
+            # Convert payment date string to date object if provided
+            if payment_date_str:
+                payment_date = date.fromisoformat(payment_date_str)
+            else:
+                payment_date = date.today()
             
-        success_count = 0
-        failed_list = []
-        total_amount = 0
-        
-        # If no specific employees are provided, get all employees with salary records
-        if employee_ids is None:
-            salary_records = Salary.objects.all()
-            employee_ids = [s.eid.eid for s in salary_records]
-        
-        # Process each employee
-        for eid in employee_ids:
             try:
-                # Get the employee's salary record
-                salary_record = Salary.objects.get(eid=eid)
-                
-                # Check if payment already exists for this date
-                existing_payment = SalaryPayments.objects.filter(
-                    eid=salary_record.eid,
-                    paiddate=payment_date
-                ).first()
-                
-                if existing_payment:
-                    failed_list.append({
-                        'eid': eid,
-                        'error': 'Payment already exists for this date'
-                    })
-                    continue
-                
-                # Create the payment record
-                payment = SalaryPayments(
-                    eid=salary_record.eid,
-                    salary=salary_record.netsalary,
-                    paiddate=payment_date
-                )
-                payment.save()
-                
-                # Update statistics
-                success_count += 1
-                total_amount += float(salary_record.netsalary)
-                
-            except Salary.DoesNotExist:
-                # No salary record for this employee
-                failed_list.append({
-                    'eid': eid,
-                    'error': 'No salary record found for this employee'
-                })
-            except Exception as e:
-                # Record failed payments
-                failed_list.append({
-                    'eid': eid,
-                    'error': str(e)
-                })
+                batch_size = int(batch_size) if batch_size else DEFAULT_BATCH_SIZE
+                chunk_size = int(chunk_size) if chunk_size else DEFAULT_CHUNK_SIZE
+            except (TypeError, ValueError):
+                batch_size = chunk_size = 0
+            if batch_size < 1 or chunk_size < 1:
+                return Response({
+                    'success': False,
+                    'message': 'batch_size and chunk_size must be positive integers'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            # A bare string would otherwise be frozen as one employee per character
+            if employee_ids is not None and not isinstance(employee_ids, list):
+                return Response({
+                    'success': False,
+                    'message': 'employee_ids must be a list of employee IDs'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            run = start_payroll_run(payment_date, employee_ids, chunk_size, batch_size)
+        
+        # Pay chunk by chunk, committing a checkpoint after each one
+        run = process_payroll_run(run.id)
+        success_count = run.successcount
+        failed_list = run.failedpayments
         
         if success_count > 0:
             response_status = status.HTTP_200_OK
@@ -781,11 +942,13 @@ def mass_salary_payment(request):
             
         return Response({
             'success': success_count > 0,
+            'run_id': run.id,
+            'status': run.status,
             'success_count': success_count,
             'failed_count': len(failed_list),
             'failed_payments': failed_list,
-            'total_amount': total_amount,
-            'payment_date': payment_date.isoformat()
+            'total_amount': float(run.totalamount),
+            'payment_date': run.paymentdate.isoformat()
         }, status=response_status)
         
     except Exception as e:
@@ -794,21 +957,60 @@ def mass_salary_payment(request):
         logger = logging.getLogger(__name__)
         logger.error(f"Error in mass_salary_payment: {str(e)}")
         
-        return Response({
+        response_data = {
             'success': False,
             'message': f"Server error: {str(e)}"
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        }
+        if run is not None:
+            # Let the client retry the run from its last checkpoint
+            response_data['run_id'] = run.id
+        return Response(response_data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+def mass_payment_preview(request):
+    """Dry run of a mass payment: what would be paid, skipped or flagged. Writes nothing."""
+    employee_ids = request.data.get('employee_ids', None)  # Optional list of employee IDs
+    payment_date_str = request.data.get('payment_date', None)  # Optional payment date
+    
+    try:
+        payment_date = date.fromisoformat(payment_date_str) if payment_date_str else date.today()
+    except (TypeError, ValueError):
+        return Response({"error": "payment_date must be a date in YYYY-MM-DD format"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        return Response(preview_mass_payment(payment_date, employee_ids))
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error in mass_payment_preview: {str(e)}")
+        return Response({"error": f"Server error: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+def payroll_run_details(request, run_id):
+    """Get progress, throughput and chunk timings of a payroll run"""
+    try:
+        run = PayrollRun.objects.get(pk=run_id)
+    except PayrollRun.DoesNotExist:
+        return Response({"error": f"No payroll run found with ID {run_id}"}, status=status.HTTP_404_NOT_FOUND)
+    return Response(payroll_run_status(run))
 
 
 # Bank Account Details related functions
 @api_view(['GET', 'POST'])
+@renderer_classes(STREAMING_RENDERER_CLASSES)
 def bank_account_details(request):
     """Get all bank account details or add a new one"""
     if request.method == 'GET':
         try:
             # Get all bank account records
             accounts = BankAccountDetails.objects.all()
-            serializer = BankAccountDetailsSerializer(accounts, many=True)
+            mode = wants_stream(request)
+            if mode:
+                return stream_response(BankAccountDetailsSerializer, accounts, mode, requested_fields(request))
+            serializer = sparse_serializer(BankAccountDetailsSerializer, request, accounts, many=True)
             return Response(serializer.data)
         except Exception as e:
             # Log the error
@@ -823,6 +1025,7 @@ def bank_account_details(request):
             serializer = BankAccountDetailsSerializer(data=data)
             if serializer.is_valid():
                 serializer.save()
+                bump_table_versions(BankAccountDetails)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
@@ -849,7 +1052,7 @@ def bank_account_detail(request, eid):
         
     if request.method == 'GET':
         # Get single bank account detail
-        serializer = BankAccountDetailsSerializer(account)
+        serializer = sparse_serializer(BankAccountDetailsSerializer, request, account)
         return Response(serializer.data)
         
     elif request.method == 'PUT':
@@ -858,24 +1061,30 @@ def bank_account_detail(request, eid):
         serializer = BankAccountDetailsSerializer(account, data=data)
         if serializer.is_valid():
             serializer.save()
+            bump_table_versions(BankAccountDetails)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
     elif request.method == 'DELETE':
         # Delete bank account detail
         account.delete()
+        bump_table_versions(BankAccountDetails)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 # Training Budget related functions
 @api_view(['GET', 'POST'])
+@renderer_classes(STREAMING_RENDERER_CLASSES)
 def training_budgets(request):
     """Get all training budgets or add a new one"""
     if request.method == 'GET':
         try:
             # Get all training budgets using Django ORM
             budgets = TrainingBudget.objects.all()
-            serializer = TrainingBudgetSerializer(budgets, many=True)
+            mode = wants_stream(request)
+            if mode:
+                return stream_response(TrainingBudgetSerializer, budgets, mode, requested_fields(request))
+            serializer = sparse_serializer(TrainingBudgetSerializer, request, budgets, many=True)
             return Response(serializer.data)
         except Exception as e:
             # Log the error
@@ -888,7 +1097,10 @@ def training_budgets(request):
             # Add a new training budget record using Django ORM
             serializer = TrainingBudgetSerializer(data=request.data)
             if serializer.is_valid():
-                serializer.save()
+                with transaction.atomic():
+                    serializer.save()
+                    bump_table_versions(TrainingBudget)
+                    apply_dashboard_delta({}, dashboard_contribution(serializer.instance))
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             
@@ -916,20 +1128,27 @@ def training_budget_detail(request, eid):
         
     if request.method == 'GET':
         # Get single training budget
-        serializer = TrainingBudgetSerializer(budget)
+        serializer = sparse_serializer(TrainingBudgetSerializer, request, budget)
         return Response(serializer.data)
         
     elif request.method == 'PUT':
         # Update training budget
         serializer = TrainingBudgetSerializer(budget, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                before = dashboard_contribution(budget)
+                serializer.save()
+                bump_table_versions(TrainingBudget)
+                apply_dashboard_delta(before, dashboard_contribution(serializer.instance))
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
     elif request.method == 'DELETE':
         # Delete training budget
-        budget.delete()
+        with transaction.atomic():
+            apply_dashboard_delta(dashboard_contribution(budget), {})
+            budget.delete()
+            bump_table_versions(TrainingBudget)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -973,7 +1192,7 @@ def training_requests(request):
                 formatted_item = {k.lower(): v for k, v in item.items()}
                 formatted_result.append(formatted_item)
                 
-            return Response(formatted_result)
+            return Response(select_fields(formatted_result, requested_fields(request)))
             
         except Exception as e:
             # Log the error with detailed information
@@ -992,7 +1211,7 @@ def training_requests(request):
             # Add a new training request using raw SQL
             from django.db import connection
             
-            with connection.cursor() as cursor:
+            with transaction.atomic(), connection.cursor() as cursor:
                 cursor.execute("""
                     INSERT INTO trainingbudgetallocation 
                     (Eid, RequestedAmount, Reason, AppliedDate, Status, GrantedDate, ProofDocumentUrl)
@@ -1006,6 +1225,8 @@ def training_requests(request):
                     data.get('granteddate'),
                     data.get('proofdocumenturl')
                 ])
+                apply_dashboard_delta({}, dashboard_contribution(TrainingRequest(status=data.get('status', 'Pending'))))
+                bump_table_versions(TrainingRequest)
             
             # Return the created data
             data['id'] = f"tr_{data.get('eid')}"
@@ -1086,7 +1307,7 @@ def training_request_detail(request, id):
     if request.method == 'GET':
         # Convert dict keys to lowercase to match serializer field names
         formatted_request = {k.lower(): v for k, v in training_request.items()}
-        return Response(formatted_request)
+        return Response(select_fields(formatted_request, requested_fields(request)))
         
     elif request.method == 'PUT':
         try:
@@ -1149,7 +1370,7 @@ def training_request_detail(request, id):
             logger.info(f"Update parameters - Applied date: {applied_date}, Granted date: {granted_date}")
             
             # Build and execute the SQL UPDATE query
-            with connection.cursor() as cursor:
+            with transaction.atomic(), connection.cursor() as cursor:
                 logger.info(f"Executing UPDATE query for Eid={eid}")
                 cursor.execute("""
                     UPDATE trainingbudgetallocation
@@ -1188,6 +1409,12 @@ def training_request_detail(request, id):
                             {"error": f"Training request with ID {id} not found"}, 
                             status=status.HTTP_404_NOT_FOUND
                         )
+                else:
+                    bump_table_versions(TrainingRequest)
+                    apply_dashboard_delta(
+                        dashboard_contribution(TrainingRequest(status=training_request['Status'])),
+                        dashboard_contribution(TrainingRequest(status=status_value))
+                    )
             
             # Helper function to safely format dates
             def format_date(date_value):
@@ -1230,11 +1457,14 @@ def training_request_detail(request, id):
             # Delete the training request using raw SQL
             from django.db import connection
             
-            with connection.cursor() as cursor:
+            with transaction.atomic(), connection.cursor() as cursor:
                 cursor.execute("""
                     DELETE FROM trainingbudgetallocation
                     WHERE Eid = %s
                 """, [eid])
+                if cursor.rowcount:
+                    apply_dashboard_delta(dashboard_contribution(TrainingRequest(status=training_request['Status'])), {})
+                    bump_table_versions(TrainingRequest)
             
             return Response(status=status.HTTP_204_NO_CONTENT)
         except Exception as e:
@@ -1249,12 +1479,13 @@ def training_request_detail(request, id):
 
 # Leave related functions
 @api_view(['GET', 'POST'])
+@conditional_on_tables(LeaveType)
 def leave_types(request):
     """Get all leave types or add a new leave type"""
     if request.method == 'GET':
         try:
-            leave_types = LeaveType.objects.all()
-            serializer = LeaveTypeSerializer(leave_types, many=True)
+            leave_types = reference.leave_types.all()
+            serializer = sparse_serializer(LeaveTypeSerializer, request, leave_types, many=True)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -1279,7 +1510,7 @@ def leave_type_details(request, lid):
         return Response({'error': 'Leave type not found'}, status=status.HTTP_404_NOT_FOUND)
     
     if request.method == 'GET':
-        serializer = LeaveTypeSerializer(leave_type)
+        serializer = sparse_serializer(LeaveTypeSerializer, request, leave_type)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
     elif request.method == 'PUT':
@@ -1295,12 +1526,16 @@ def leave_type_details(request, lid):
 
 
 @api_view(['GET', 'POST'])
+@renderer_classes(STREAMING_RENDERER_CLASSES)
 def employee_leave_balances(request):
     """Get all employee leave balances or add/update a new one"""
     if request.method == 'GET':
         try:
             balances = EmployeeLeaveBalance.objects.all()
-            serializer = EmployeeLeaveBalanceSerializer(balances, many=True)
+            mode = wants_stream(request)
+            if mode:
+                return stream_response(EmployeeLeaveBalanceSerializer, balances, mode, requested_fields(request))
+            serializer = sparse_serializer(EmployeeLeaveBalanceSerializer, request, balances, many=True)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -1310,6 +1545,7 @@ def employee_leave_balances(request):
             serializer = EmployeeLeaveBalanceSerializer(data=request.data)
             if serializer.is_valid():
                 serializer.save()
+                bump_table_versions(EmployeeLeaveBalance)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
@@ -1325,18 +1561,20 @@ def employee_leave_balance_details(request, eid):
         return Response({'error': 'Employee leave balance not found'}, status=status.HTTP_404_NOT_FOUND)
     
     if request.method == 'GET':
-        serializer = EmployeeLeaveBalanceSerializer(balance)
+        serializer = sparse_serializer(EmployeeLeaveBalanceSerializer, request, balance)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
     elif request.method == 'PUT':
         serializer = EmployeeLeaveBalanceSerializer(balance, data=request.data)
         if serializer.is_valid():
             serializer.save()
+            bump_table_versions(EmployeeLeaveBalance)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     elif request.method == 'DELETE':
         balance.delete()
+        bump_table_versions(EmployeeLeaveBalance)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -1362,13 +1600,21 @@ def generate_leave_id():
 
 
 @api_view(['GET', 'POST'])
+@renderer_classes(STREAMING_RENDERER_CLASSES + COLUMNAR_RENDERER_CLASSES)
 def leave_applications(request):
     """Get all leave applications or add a new leave application"""
     if request.method == 'GET':
         try:
             applications = LeaveApplications.objects.all()
-            serializer = LeaveApplicationsSerializer(applications, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            export_format = columnar_format(request)
+            if export_format:
+                return columnar_response(LeaveApplicationsSerializer, applications, export_format,
+                                         'leave_applications', requested_fields(request))
+            mode = wants_stream(request)
+            if mode:
+                return stream_response(LeaveApplicationsSerializer, applications, mode, requested_fields(request))
+            data = encode_rows(LeaveApplicationsSerializer, applications, requested_fields(request))
+            return Response(data, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
@@ -1393,7 +1639,10 @@ def leave_applications(request):
             
             serializer = LeaveApplicationsSerializer(data=data)
             if serializer.is_valid():
-                serializer.save()
+                with transaction.atomic():
+                    serializer.save()
+                    bump_table_versions(LeaveApplications)
+                    apply_dashboard_delta({}, dashboard_contribution(serializer.instance))
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             else:
                 print(f"Serializer errors: {serializer.errors}")  # Debug log
@@ -1414,14 +1663,18 @@ def leave_application_details(request, app_id):
         return Response({'error': 'Leave application not found'}, status=status.HTTP_404_NOT_FOUND)
     
     if request.method == 'GET':
-        serializer = LeaveApplicationsSerializer(application)
+        serializer = sparse_serializer(LeaveApplicationsSerializer, request, application)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
     elif request.method == 'PUT':
         print(f"Updating application with data: {request.data}")  # Debug log
         serializer = LeaveApplicationsSerializer(application, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                before = dashboard_contribution(application)
+                serializer.save()
+                bump_table_versions(LeaveApplications)
+                apply_dashboard_delta(before, dashboard_contribution(serializer.instance))
             print(f"Successfully updated application")  # Debug log
             return Response(serializer.data, status=status.HTTP_200_OK)
         else:
@@ -1429,7 +1682,10 @@ def leave_application_details(request, app_id):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     elif request.method == 'DELETE':
-        application.delete()
+        with transaction.atomic():
+            apply_dashboard_delta(dashboard_contribution(application), {})
+            application.delete()
+            bump_table_versions(LeaveApplications)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -1440,30 +1696,38 @@ def employee_leave_applications(request, eid):
     if request.method == 'GET':
         try:
             applications = LeaveApplications.objects.filter(eid=eid)
-            serializer = LeaveApplicationsSerializer(applications, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            data = encode_rows(LeaveApplicationsSerializer, applications, requested_fields(request))
+            return Response(data, status=status.HTTP_200_OK)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 # Resource Allocation views
 @api_view(['GET', 'POST'])
+@renderer_classes(STREAMING_RENDERER_CLASSES)
 def resource_allocations(request):
     """
     List all resource allocations or create a new one
     """
     if request.method == 'GET':
         try:
-            allocations = ResourceAllocation.objects.all()
-            serializer = ResourceAllocationSerializer(allocations, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            # Employee names come from the same query, so rows can skip the instance serializer
+            allocations = with_employee_names(ResourceAllocation.objects.all())
+            mode = wants_stream(request)
+            if mode:
+                return stream_response(ResourceAllocationSerializer, allocations, mode, requested_fields(request))
+            return Response(encode_rows(ResourceAllocationSerializer, allocations, requested_fields(request)),
+                            status=status.HTTP_200_OK)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
     elif request.method == 'POST':
         serializer = ResourceAllocationSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                serializer.save()
+                bump_table_versions(ResourceAllocation)
+                apply_dashboard_delta({}, dashboard_contribution(serializer.instance))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -1479,18 +1743,25 @@ def resource_allocation_details(request, allocation_id):
         return Response(status=status.HTTP_404_NOT_FOUND)
     
     if request.method == 'GET':
-        serializer = ResourceAllocationSerializer(allocation)
+        serializer = sparse_serializer(ResourceAllocationSerializer, request, allocation)
         return Response(serializer.data)
     
     elif request.method == 'PUT':
         serializer = ResourceAllocationSerializer(allocation, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                before = dashboard_contribution(allocation)
+                serializer.save()
+                bump_table_versions(ResourceAllocation)
+                apply_dashboard_delta(before, dashboard_contribution(serializer.instance))
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     elif request.method == 'DELETE':
-        allocation.delete()
+        with transaction.atomic():
+            apply_dashboard_delta(dashboard_contribution(allocation), {})
+            allocation.delete()
+            bump_table_versions(ResourceAllocation)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -1501,52 +1772,88 @@ def employee_resource_allocations(request, eid):
     """
     if request.method == 'GET':
         try:
-            allocations = ResourceAllocation.objects.filter(eid=eid)
-            serializer = ResourceAllocationSerializer(allocations, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            allocations = with_employee_names(ResourceAllocation.objects.filter(eid=eid))
+            return Response(encode_rows(ResourceAllocationSerializer, allocations, requested_fields(request)),
+                            status=status.HTTP_200_OK)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+# Bulk writes: a JSON list of rows per request, written in one transaction
+@api_view(['POST', 'PUT', 'PATCH', 'DELETE'])
+def employee_details_bulk(request):
+    return bulk_response(request, EMPLOYEE_DETAILS_BULK)
+
+
+@api_view(['POST', 'PUT', 'PATCH', 'DELETE'])
+def employee_leave_balances_bulk(request):
+    return bulk_response(request, LEAVE_BALANCES_BULK)
+
+
+@api_view(['POST', 'PUT', 'PATCH', 'DELETE'])
+def bank_accounts_bulk(request):
+    return bulk_response(request, BANK_ACCOUNTS_BULK)
+
+
+@api_view(['POST', 'PUT', 'PATCH', 'DELETE'])
+def salary_bulk(request):
+    return bulk_response(request, SALARIES_BULK)
+
+
+@api_view(['POST', 'PUT', 'PATCH', 'DELETE'])
+def resource_allocations_bulk(request):
+    return bulk_response(request, RESOURCE_ALLOCATIONS_BULK)
+
+
 # User management functions for admin settings
+# Keyset orderings for the user listing. Email is the primary key of users, so its index
+# serves both the prefix search and each page; Eid is an unindexed varchar there, sorted as
+# text, so it is not offered
+USER_ORDERINGS = {
+    'email': ('email',),
+}
+
+
+def user_listing():
+    """
+    Users with their role name joined in, as dicts; 'Unknown' when the role does not exist
+    """
+    # users.urid is declared as an integer, usertypes.urid as text: cast the outer side so
+    # the usertypes primary key is still used for the lookup
+    user_type = UserTypes.objects.filter(urid=Cast(OuterRef('urid'), CharField(max_length=100))).values('usertype')[:1]
+    return Users.objects.values('eid', 'email', 'password', 'urid',
+                                userType=Coalesce(Subquery(user_type), Value('Unknown')))
+
+
 @api_view(['GET', 'POST'])
 def users_management(request):
     """
-    Get all users or create a new user for admin settings
+    Get all users or create a new user for admin settings. ?search= matches an email prefix;
+    ?limit= or ?cursor= returns one keyset page as {'results', 'next'}
     """
     if request.method == 'GET':
-        # Get all users with their role information
-        users = Users.objects.all()
-        users_data = []
-        
-        for user in users:
-            try:
-                user_type = UserTypes.objects.get(urid=user.urid)
-                user_data = {
-                    'eid': user.eid,
-                    'email': user.email,
-                    'password': user.password,
-                    'urid': user.urid,
-                    'userType': user_type.usertype
-                }
-                users_data.append(user_data)
-            except UserTypes.DoesNotExist:
-                user_data = {
-                    'eid': user.eid,
-                    'email': user.email,
-                    'password': user.password,
-                    'urid': user.urid,
-                    'userType': 'Unknown'
-                }
-                users_data.append(user_data)
-        
-        return Response(users_data)
+        # Get all users with their role information in one query
+        users = user_listing()
+        search = request.query_params.get('search')
+        if search:
+            users = users.filter(email__istartswith=search)
+        fields = requested_fields(request)
+
+        if not wants_pagination(request):
+            return Response(select_fields(list(users.order_by('email')), fields))
+
+        try:
+            rows, next_cursor = paginate_keyset(request, users, USER_ORDERINGS, 'email')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'results': select_fields(rows, fields), 'next': next_cursor})
     
     elif request.method == 'POST':
         # Create a new user
         serializer = UsersSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
+            bump_table_versions(Users)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -1556,52 +1863,41 @@ def user_management_details(request, eid):
     """
     Get, update or delete a specific user for admin settings
     """
+    if request.method == 'GET':
+        # Get single user with role information, joined like the listing
+        user_data = user_listing().filter(eid=eid).first()
+        if user_data is None:
+            return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(select_fields(user_data, requested_fields(request)))
+
     try:
         user = Users.objects.get(eid=eid)
     except Users.DoesNotExist:
         return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
     
-    if request.method == 'GET':
-        # Get single user with role information
-        try:
-            user_type = UserTypes.objects.get(urid=user.urid)
-            user_data = {
-                'eid': user.eid,
-                'email': user.email,
-                'password': user.password,
-                'urid': user.urid,
-                'userType': user_type.usertype
-            }
-        except UserTypes.DoesNotExist:
-            user_data = {
-                'eid': user.eid,
-                'email': user.email,
-                'password': user.password,
-                'urid': user.urid,
-                'userType': 'Unknown'
-            }
-        return Response(user_data)
-    
-    elif request.method == 'PUT':
+    if request.method == 'PUT':
         # Update user
         serializer = UsersSerializer(user, data=request.data)
         if serializer.is_valid():
             serializer.save()
+            bump_table_versions(Users)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     elif request.method == 'DELETE':
         # Delete user
         user.delete()
+        bump_table_versions(Users)
         return Response({'message': 'User deleted successfully'}, status=status.HTTP_204_NO_CONTENT)
 
 
 @api_view(['GET'])
+@conditional_on_tables(UserTypes)
 def user_types(request):
     """
     Get all user types for dropdown selection
     """
-    user_types = UserTypes.objects.all()
+    user_types = reference.user_types.all()
     user_types_data = []
     
     for user_type in user_types:
@@ -1610,4 +1906,4 @@ def user_types(request):
             'userType': user_type.usertype
         })
     
-    return Response(user_types_data)
\ No newline at end of file
+    return Response(select_fields(user_types_data, requested_fields(request)))
\ No newline at end of file